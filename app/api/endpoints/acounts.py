@@ -1,26 +1,63 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from typing import List, Optional
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
+from app.core.admission import admission, Priority
+from app.core.config import settings
 from app.core.database import get_database
+from app.core.events import event_hub
 from app.crud.account import AccountCRUD
+from app.crud.idempotency import IdempotencyCRUD
+from app.crud.repository import AccountRepository, MongoAccountRepository, memory_account_repository
 from app.services.account_service import AccountService
+from app.services.idempotency_service import IdempotencyService, request_fingerprint
 from app.schemas.account import AccountCreate, AccountUpdate, AccountResponse
 
 
 
 router = APIRouter()
 
+# Dependencia para obtener el repositorio de cuentas configurado
+async def get_account_repository(db: AsyncIOMotorDatabase = Depends(get_database)) -> AccountRepository:
+    if settings.ACCOUNT_BACKEND == "memory":
+        return memory_account_repository
+    return MongoAccountRepository(db)
+
 # Dependencia para obtener una instancia de accountService
-async def get_account_service(db: AsyncIOMotorDatabase = Depends(get_database)) -> AccountService:
-    crud = AccountCRUD(db)
+async def get_account_service(repository: AccountRepository = Depends(get_account_repository)) -> AccountService:
+    crud = AccountCRUD(repository)
     service = AccountService(crud)
     return service
 
-@router.post("/accounts", response_model=AccountResponse, status_code=status.HTTP_201_CREATED)
+# Dependencia para obtener una instancia de IdempotencyService
+async def get_idempotency_service(db: AsyncIOMotorDatabase = Depends(get_database)) -> IdempotencyService:
+    if settings.ACCOUNT_BACKEND == "memory":
+        return IdempotencyService(None) # Solo la caché en memoria del proceso
+    return IdempotencyService(IdempotencyCRUD(db))
+
+def idempotency_scope(request: Request, idempotency_key: str) -> str:
+    """Asocia la clave al método y la ruta para que no colisione entre endpoints."""
+    return f"{request.method}:{request.url.path}:{idempotency_key}"
+
+# Límites de admisión por ruta: las operaciones sobre una sola cuenta tienen
+# prioridad sobre los listados completos cuando el pool está saturado.
+create_account_limit = admission.limit("create_account", settings.ADMISSION_WRITE_MAX_CONCURRENT, Priority.HIGH)
+update_account_limit = admission.limit("update_account", settings.ADMISSION_WRITE_MAX_CONCURRENT, Priority.HIGH)
+list_accounts_limit = admission.limit("list_accounts", settings.ADMISSION_LIST_MAX_CONCURRENT, Priority.LOW)
+
+@router.post(
+    "/accounts",
+    response_model=AccountResponse,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(create_account_limit)]
+)
 async def create_bank_account(
+    request: Request,
     account_data: AccountCreate,
-    account_service: AccountService = Depends(get_account_service)
+    account_service: AccountService = Depends(get_account_service),
+    idempotency_service: IdempotencyService = Depends(get_idempotency_service),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", min_length=1, max_length=255)
 ):
     """
     Crea una nueva cuenta bancaria.
@@ -33,27 +70,43 @@ async def create_bank_account(
     - **email**: Email del cliente.
     - **address**: Dirección del cliente.
     - **balance**: Saldo inicial (opcional, por defecto 0.0).
+
+    Si se envía la cabecera **Idempotency-Key**, los reintentos con la misma clave
+    devuelven la respuesta original sin crear otra cuenta.
     """
-    new_account = await account_service.create_new_account(account_data)
-    # Convertir el modelo account a accountResponse
-    return AccountResponse(
-        id=new_account.id,
-        account_number=new_account.account_number,
-        account_type=new_account.account_type,
-        customer_name=new_account.customer_name,
-        document_type=new_account.document_type,
-        document_number=new_account.document_number,
-        phone=new_account.phone,
-        email=new_account.email,
-        address=new_account.address,
-        balance=new_account.balance
+    async def create():
+        new_account = await account_service.create_new_account(account_data)
+        # Convertir el modelo account a accountResponse
+        return AccountResponse(
+            id=new_account.id,
+            account_number=new_account.account_number,
+            account_type=new_account.account_type,
+            customer_name=new_account.customer_name,
+            document_type=new_account.document_type,
+            document_number=new_account.document_number,
+            phone=new_account.phone,
+            email=new_account.email,
+            address=new_account.address,
+            balance=new_account.balance
+        )
+
+    if idempotency_key is None:
+        return await create()
+    return await idempotency_service.execute(
+        idempotency_scope(request, idempotency_key),
+        request_fingerprint(account_data),
+        create,
+        status_code=status.HTTP_201_CREATED
     )
 
-@router.patch("/accounts/{account_id}", response_model=AccountResponse)
+@router.patch("/accounts/{account_id}", response_model=AccountResponse, dependencies=[Depends(update_account_limit)])
 async def update_account(
+    request: Request,
     account_id: str,
     update_data: AccountUpdate,
-    account_service: AccountService = Depends(get_account_service)
+    account_service: AccountService = Depends(get_account_service),
+    idempotency_service: IdempotencyService = Depends(get_idempotency_service),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", min_length=1, max_length=255)
 ):
     """
     Actualiza una cuenta existente.
@@ -69,25 +122,37 @@ async def update_account(
     - **balance**: Nuevo saldo (opcional).
     
     Al menos uno de los campos debe ser proporcionado.
+
+    Si se envía la cabecera **Idempotency-Key**, los reintentos con la misma clave
+    devuelven la respuesta original sin volver a aplicar el movimiento de saldo.
     """
-    updated_account = await account_service.update_account_service(account_id, update_data)
-    if not updated_account:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Cuenta no encontrada o ID inválido")
-    # Convertir el modelo account a accountResponse
-    return AccountResponse(
-        id=updated_account.id,
-        account_number=updated_account.account_number,
-        account_type=updated_account.account_type,
-        customer_name=updated_account.customer_name,
-        document_type=updated_account.document_type,
-        document_number=updated_account.document_number,
-        phone=updated_account.phone,
-        email=updated_account.email,
-        address=updated_account.address,
-        balance=updated_account.balance
+    async def update():
+        updated_account = await account_service.update_account_service(account_id, update_data)
+        if not updated_account:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Cuenta no encontrada o ID inválido")
+        # Convertir el modelo account a accountResponse
+        return AccountResponse(
+            id=updated_account.id,
+            account_number=updated_account.account_number,
+            account_type=updated_account.account_type,
+            customer_name=updated_account.customer_name,
+            document_type=updated_account.document_type,
+            document_number=updated_account.document_number,
+            phone=updated_account.phone,
+            email=updated_account.email,
+            address=updated_account.address,
+            balance=updated_account.balance
+        )
+
+    if idempotency_key is None:
+        return await update()
+    return await idempotency_service.execute(
+        idempotency_scope(request, idempotency_key),
+        request_fingerprint(update_data),
+        update
     )
 
-@router.get("/accounts", response_model=List[AccountResponse])
+@router.get("/accounts", response_model=List[AccountResponse], dependencies=[Depends(list_accounts_limit)])
 async def list_all_accounts(
     account_service: AccountService = Depends(get_account_service)
 ):
@@ -107,4 +172,46 @@ async def list_all_accounts(
         email=account.email,
         address=account.address,
         balance=account.balance
-    ) for account in accounts]
\ No newline at end of file
+    ) for account in accounts]
+
+@router.get("/accounts/events", response_class=StreamingResponse)
+async def stream_account_events(
+    request: Request,
+    account_ids: Optional[str] = Query(None, description="IDs de cuenta separados por coma (opcional)")
+):
+    """
+    Flujo Server-Sent Events con los cambios de cuentas (creación y actualización de saldo o datos).
+    - **account_ids**: Limita el flujo a las cuentas indicadas.
+
+    Reemplaza el sondeo periódico de GET /accounts para los tableros.
+    """
+    ids = [account_id.strip() for account_id in account_ids.split(",") if account_id.strip()] if account_ids else None
+    subscription = event_hub.subscribe(ids)
+    if subscription is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Se alcanzó el máximo de suscriptores de eventos",
+            headers={"Retry-After": str(settings.ADMISSION_RETRY_AFTER)}
+        )
+
+    async def event_stream():
+        try:
+            yield "retry: 3000\n\n"
+            while not subscription.closed:
+                if await request.is_disconnected():
+                    break
+                event = await subscription.get(timeout=settings.EVENTS_HEARTBEAT_SECONDS)
+                if event is None:
+                    if subscription.closed:
+                        break # Apagado del servidor: se libera la conexión de inmediato
+                    yield ": keep-alive\n\n" # Mantiene viva la conexión a través de proxies
+                    continue
+                yield f"id: {event.id}\nevent: {event.type}\ndata: {event.data}\n\n"
+        finally:
+            event_hub.unsubscribe(subscription)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -0,0 +1,22 @@
+from fastapi import APIRouter
+
+from app.core.admission import admission
+from app.core.events import event_hub
+
+router = APIRouter()
+
+@router.get("/metrics/admission", tags=["metrics"])
+async def admission_metrics():
+    """
+    Estado del control de admisión: cupos activos, profundidad de las colas
+    y conteo de solicitudes rechazadas por cada ruta.
+    """
+    return admission.stats()
+
+@router.get("/metrics/events", tags=["metrics"])
+async def events_metrics():
+    """
+    Estado del hub de eventos: suscriptores, eventos pendientes y descartados
+    o combinados por consumidores lentos.
+    """
+    return event_hub.stats()
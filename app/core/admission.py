@@ -0,0 +1,182 @@
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+
+
+class Priority(IntEnum):
+    """Prioridad de admisión. Los valores menores se atienden primero."""
+    HIGH = 0 # Operaciones baratas sobre una sola cuenta
+    LOW = 1 # Listados y exportaciones pesadas
+
+
+class AdmissionRejected(Exception):
+    """La solicitud no pudo ser admitida (cola llena o tiempo de espera agotado)."""
+
+    def __init__(self, limiter: str, reason: str):
+        super().__init__(f"{limiter}: {reason}")
+        self.limiter = limiter
+        self.reason = reason
+
+
+class ConcurrencyLimiter:
+    """Limita la concurrencia con una cola de espera acotada y ordenada por prioridad."""
+
+    def __init__(self, name: str, max_concurrent: int, max_queue: int):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.active = 0
+        self._queued = 0
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        # Contadores expuestos para observabilidad
+        self.admitted = 0
+        self.rejected_queue_full = 0
+        self.rejected_timeout = 0
+
+    async def acquire(self, priority: Priority, timeout: float):
+        """Obtiene un cupo o lanza AdmissionRejected si no es posible a tiempo."""
+        if self.active < self.max_concurrent and self._queued == 0:
+            self.active += 1
+            self.admitted += 1
+            return
+        if self._queued >= self.max_queue:
+            self.rejected_queue_full += 1
+            raise AdmissionRejected(self.name, "queue_full")
+        if timeout <= 0:
+            self.rejected_timeout += 1
+            raise AdmissionRejected(self.name, "timeout")
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (int(priority), next(self._sequence), future))
+        self._queued += 1
+        try:
+            await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            if future.done():
+                # El cupo se asignó justo al vencer el plazo: se conserva
+                self.admitted += 1
+                return
+            future.cancel()
+            self._queued -= 1
+            self.rejected_timeout += 1
+            raise AdmissionRejected(self.name, "timeout")
+        except asyncio.CancelledError:
+            if future.done():
+                # El cupo ya había sido transferido a esta solicitud
+                self.release()
+            else:
+                future.cancel()
+                self._queued -= 1
+            raise
+        self.admitted += 1
+
+    def release(self):
+        """Libera un cupo, transfiriéndolo al siguiente en espera si lo hay."""
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if future.done():
+                continue # Solicitud que abandonó la cola
+            self._queued -= 1
+            future.set_result(None) # El cupo pasa directamente al siguiente
+            return
+        self.active -= 1
+
+    def stats(self) -> dict:
+        """Devuelve el estado actual del limitador."""
+        return {
+            "active": self.active,
+            "queued": self._queued,
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "admitted": self.admitted,
+            "rejected_queue_full": self.rejected_queue_full,
+            "rejected_timeout": self.rejected_timeout,
+        }
+
+
+class AdmissionController:
+    """
+    Control de admisión en dos niveles: un límite propio por ruta y un
+    límite compartido cuya cola atiende primero a las solicitudes de mayor
+    prioridad. Por defecto el límite compartido es el tamaño del pool de
+    MongoDB del worker, de modo que las solicitudes admitidas no esperan
+    una conexión libre dentro del driver.
+    """
+
+    def __init__(self, max_concurrent: int, max_queue: int, queue_timeout: float, retry_after: int):
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.shared = ConcurrencyLimiter("shared", max_concurrent, max_queue)
+        self.routes: Dict[str, ConcurrencyLimiter] = {}
+
+    def register(self, route: str, max_concurrent: int, max_queue: Optional[int] = None) -> ConcurrencyLimiter:
+        """Registra (o devuelve) el limitador de una ruta."""
+        if route not in self.routes:
+            self.routes[route] = ConcurrencyLimiter(
+                route, max_concurrent, max_queue if max_queue is not None else self.shared.max_queue
+            )
+        return self.routes[route]
+
+    @asynccontextmanager
+    async def slot(self, route: str, priority: Priority):
+        """Mantiene un cupo de la ruta y uno compartido mientras dura el bloque."""
+        limiter = self.routes[route]
+        deadline = time.monotonic() + self.queue_timeout
+        await limiter.acquire(priority, self.queue_timeout)
+        try:
+            await self.shared.acquire(priority, deadline - time.monotonic())
+            try:
+                yield
+            finally:
+                self.shared.release()
+        finally:
+            limiter.release()
+
+    def limit(self, route: str, max_concurrent: int, priority: Priority = Priority.HIGH):
+        """Crea una dependencia de FastAPI que aplica el control de admisión a una ruta."""
+        self.register(route, max_concurrent)
+
+        async def dependency():
+            if not settings.ADMISSION_ENABLED:
+                yield
+                return
+            try:
+                async with self.slot(route, priority):
+                    yield
+            except AdmissionRejected:
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Servicio saturado, intente de nuevo más tarde",
+                    headers={"Retry-After": str(self.retry_after)},
+                )
+
+        return dependency
+
+    def stats(self) -> dict:
+        """Profundidad de colas y conteo de rechazos por limitador."""
+        return {
+            "shared": self.shared.stats(),
+            "routes": {name: limiter.stats() for name, limiter in self.routes.items()},
+        }
+
+
+def shared_max_concurrent() -> int:
+    """Cupos compartidos: ADMISSION_MAX_CONCURRENT o, si es 0, MONGODB_MAX_POOL_SIZE."""
+    return settings.ADMISSION_MAX_CONCURRENT or settings.MONGODB_MAX_POOL_SIZE
+
+
+admission = AdmissionController(
+    max_concurrent=shared_max_concurrent(),
+    max_queue=settings.ADMISSION_MAX_QUEUE,
+    queue_timeout=settings.ADMISSION_QUEUE_TIMEOUT,
+    retry_after=settings.ADMISSION_RETRY_AFTER,
+)
@@ -7,7 +7,44 @@ load_dotenv() # Carga las variables de entorno del archivo .env
 class Settings(BaseSettings):
     MONGODB_URI: str = os.getenv("MONGODB_URL", os.getenv("MONGODB_URI", "mongodb://localhost:27017/bank_db"))
     DATABASE_NAME: str = "bank_db"
+    MONGODB_MAX_POOL_SIZE: int = 100 # Conexiones por proceso (worker)
+    MONGODB_MIN_POOL_SIZE: int = 0 # Conexiones abiertas de antemano por proceso (worker)
+    ACCOUNT_BACKEND: str = "mongo" # "mongo" o "memory" (pruebas y benchmarks sin MongoDB)
+    BALANCE_STORAGE: str = "float" # "float" o "minor_units" (entero int64 en 'balance_minor')
+    BALANCE_SCALE: int = 2 # Decimales de la moneda: 2 -> centavos
+
+    # Control de admisión (límites de concurrencia por ruta)
+    ADMISSION_ENABLED: bool = True
+    ADMISSION_MAX_CONCURRENT: int = 0 # Cupos compartidos por todas las rutas; 0 usa MONGODB_MAX_POOL_SIZE
+    ADMISSION_MAX_QUEUE: int = 256 # Solicitudes en espera antes de rechazar
+    ADMISSION_QUEUE_TIMEOUT: float = 2.0 # Segundos máximos en la cola
+    ADMISSION_RETRY_AFTER: int = 1 # Valor de la cabecera Retry-After (segundos)
+    ADMISSION_WRITE_MAX_CONCURRENT: int = 48 # POST/PATCH de una sola cuenta
+    ADMISSION_LIST_MAX_CONCURRENT: int = 8 # Listados completos (consultas pesadas)
+
+    # Claves de idempotencia (cabecera Idempotency-Key)
+    IDEMPOTENCY_TTL_SECONDS: int = 86400 # Tiempo que se conserva cada respuesta
+    IDEMPOTENCY_CACHE_SIZE: int = 10000 # Entradas en la caché en memoria del proceso
+    IDEMPOTENCY_WAIT_TIMEOUT: float = 10.0 # Espera máxima por una solicitud original en curso
+    IDEMPOTENCY_LEASE_SECONDS: float = 30.0 # Vigencia de una reserva pendiente; vencida, otra solicitud la toma
+
+    # Eventos de cambios de saldo (Server-Sent Events)
+    EVENTS_SOURCE: str = "local" # "local" (publica el CRUD) o "change_stream" (requiere replica set)
+    EVENTS_QUEUE_SIZE: int = 100 # Eventos pendientes por suscriptor
+    EVENTS_OVERFLOW_POLICY: str = "coalesce" # "coalesce" o "drop_oldest" para consumidores lentos
+    EVENTS_MAX_SUBSCRIBERS: int = 500
+    EVENTS_HEARTBEAT_SECONDS: float = 15.0
+
+    # Servidor (python -m app.server)
+    SERVER_HOST: str = "0.0.0.0"
+    SERVER_PORT: int = 8000
+    WEB_CONCURRENCY: int = 1 # Procesos worker; 0 usa un worker por núcleo
+    SERVER_LOOP: str = "auto" # "auto" usa uvloop si está instalado; "asyncio" para forzar el estándar
+    SERVER_HTTP: str = "auto" # "auto" usa httptools si está instalado; "h11" para forzar el puro Python
+    SERVER_BACKLOG: int = 2048
+    SERVER_ACCESS_LOG: bool = True
+    GRACEFUL_SHUTDOWN_TIMEOUT: int = 30 # Segundos para terminar las solicitudes en curso al apagar
 
     model_config = SettingsConfigDict(env_file=".env", extra='ignore')
 
-settings = Settings()
\ No newline at end of file
+settings = Settings()
@@ -6,8 +6,12 @@ class MongoDB:
     database = None
 
     async def connect(self):
-        """conexión con la db."""
-        self.client = AsyncIOMotorClient(settings.MONGODB_URI)
+        """conexión con la db (un cliente y un pool por proceso worker, creado en el lifespan)."""
+        self.client = AsyncIOMotorClient(
+            settings.MONGODB_URI,
+            maxPoolSize=settings.MONGODB_MAX_POOL_SIZE,
+            minPoolSize=settings.MONGODB_MIN_POOL_SIZE
+        )
         self.database = self.client[settings.DATABASE_NAME]
         print(f"Conectado a MongoDB: {settings.MONGODB_URI}")
 
@@ -16,9 +20,11 @@ class MongoDB:
         if self.client:
             self.client.close()
             print("Conexión a MongoDB cerrada.")
+        self.client = None
+        self.database = None
 
 db = MongoDB()
 
 async def get_database():
     """Dependencia para obtener la instancia de la base de datos."""
-    return db.database
\ No newline at end of file
+    return db.database
@@ -0,0 +1,57 @@
+import math
+from typing import List
+from fastapi import Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse
+
+# Sujeto de cada campo en los mensajes de validación
+FIELD_LABELS = {
+    "customer_name": "El nombre del titular",
+    "document_number": "El número de documento",
+    "phone": "El teléfono",
+    "email": "El email",
+    "address": "La dirección",
+    "balance": "El saldo",
+    "amount": "El monto",
+}
+
+# Plantillas por tipo de error de pydantic-core; los valores de 'ctx' completan el mensaje
+ERROR_TEMPLATES = {
+    "string_too_short": "{label} debe tener al menos {min_length} caracteres",
+    "string_too_long": "{label} no puede tener más de {max_length} caracteres",
+    "string_pattern_mismatch": "{label} debe tener un formato válido",
+    "greater_than_equal": "{label} no puede ser negativo",
+    "less_than_equal": "{label} no puede ser mayor que {le:,.0f}",
+    "finite_number": "{label} debe ser un número finito",
+}
+
+def translate_error(error: dict) -> dict:
+    """Reemplaza el mensaje de un error de validación por su versión en español."""
+    value = error.get("input")
+    if isinstance(value, float) and not math.isfinite(value):
+        error = {**error, "input": str(value)} # inf/nan no se pueden serializar en JSON
+    error_type = error.get("type")
+    ctx = error.get("ctx") or {}
+    if error_type == "value_error" and "error" in ctx:
+        # Errores de los model_validator: se usa el mensaje original sin el prefijo "Value error, "
+        return {**error, "msg": str(ctx["error"])}
+    field = error["loc"][-1] if error.get("loc") else None
+    label = FIELD_LABELS.get(field)
+    template = ERROR_TEMPLATES.get(error_type)
+    if error_type == "greater_than_equal" and ctx.get("ge"):
+        template = "{label} no puede ser menor que {ge:,.0f}" # Límite inferior distinto de cero
+    if label is None or template is None:
+        return error
+    return {**error, "msg": template.format(label=label, **ctx)}
+
+def translate_errors(errors: List[dict]) -> List[dict]:
+    """Traduce una lista de errores de validación."""
+    return [translate_error(error) for error in errors]
+
+async def validation_exception_handler(request: Request, exc: RequestValidationError) -> JSONResponse:
+    """Responde 422 con los mensajes de validación en español."""
+    return JSONResponse(
+        status_code=422,
+        content={"detail": jsonable_encoder(translate_errors(exc.errors()))}
+    )
@@ -0,0 +1,189 @@
+import asyncio
+import itertools
+import json
+from collections import deque
+from typing import Iterable, List, NamedTuple, Optional, Set
+
+from app.core.config import settings
+from app.core.money import MINOR_FIELD, balance_from_storage
+
+
+class AccountEvent(NamedTuple):
+    id: int
+    type: str # account.created | account.updated
+    account_id: str
+    data: str # JSON ya serializado, compartido por todos los suscriptores
+
+
+class Subscription:
+    """Cola acotada de un suscriptor con política para consumidores lentos."""
+
+    def __init__(self, account_ids: Optional[Set[str]], max_size: int, policy: str):
+        self.account_ids = account_ids
+        self.max_size = max_size
+        self.policy = policy
+        self.closed = False
+        self.dropped = 0
+        self.coalesced = 0
+        self._events: deque = deque()
+        self._ready = asyncio.Event()
+
+    def wants(self, event: AccountEvent) -> bool:
+        """Indica si el evento corresponde al filtro de cuentas del suscriptor."""
+        return self.account_ids is None or event.account_id in self.account_ids
+
+    def push(self, event: AccountEvent) -> str:
+        """Encola un evento sin bloquear al publicador; devuelve 'queued', 'coalesced' o 'dropped'."""
+        outcome = "queued"
+        if len(self._events) >= self.max_size:
+            if self.policy == "coalesce" and self._coalesce(event):
+                return "coalesced"
+            self._events.popleft() # Se descarta el evento más antiguo
+            self.dropped += 1
+            outcome = "dropped"
+        self._events.append(event)
+        self._ready.set()
+        return outcome
+
+    def _coalesce(self, event: AccountEvent) -> bool:
+        """
+        Reemplaza el evento pendiente de la misma cuenta por el más reciente.
+        Un 'account.created' pendiente nunca se reemplaza: el suscriptor debe saber que la cuenta se creó.
+        """
+        for index, pending in enumerate(self._events):
+            if pending.account_id == event.account_id and pending.type != "account.created":
+                del self._events[index]
+                self._events.append(event)
+                self.coalesced += 1
+                return True
+        return False
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[AccountEvent]:
+        """Obtiene el siguiente evento; devuelve None si vence el plazo o la suscripción se cerró."""
+        if not self._events and not self.closed:
+            self._ready.clear()
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        if self._events:
+            return self._events.popleft()
+        return None
+
+    def close(self):
+        """Cierra la suscripción y despierta al consumidor."""
+        self.closed = True
+        self._ready.set()
+
+
+class EventHub:
+    """Difunde los cambios de cuentas a todos los suscriptores del proceso."""
+
+    def __init__(self, max_subscribers: int, queue_size: int, policy: str):
+        self.max_subscribers = max_subscribers
+        self.queue_size = queue_size
+        self.policy = policy
+        self._subscriptions: List[Subscription] = []
+        self._sequence = itertools.count(1)
+        self.published = 0
+        # Acumulados del proceso: no bajan cuando se desconecta el consumidor lento
+        self.dropped = 0
+        self.coalesced = 0
+
+    def subscribe(self, account_ids: Optional[Iterable[str]] = None) -> Optional[Subscription]:
+        """Crea una suscripción; devuelve None si se alcanzó el máximo de suscriptores."""
+        if len(self._subscriptions) >= self.max_subscribers:
+            return None
+        subscription = Subscription(
+            set(account_ids) if account_ids else None, self.queue_size, self.policy
+        )
+        self._subscriptions.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        """Elimina una suscripción."""
+        subscription.close()
+        if subscription in self._subscriptions:
+            self._subscriptions.remove(subscription)
+
+    def publish(self, event_type: str, account_id: str, payload: dict) -> AccountEvent:
+        """Serializa el evento una sola vez y lo entrega a los suscriptores interesados."""
+        event = AccountEvent(next(self._sequence), event_type, account_id, json.dumps(payload, default=str))
+        self.published += 1
+        for subscription in self._subscriptions:
+            if subscription.wants(event):
+                outcome = subscription.push(event)
+                if outcome == "dropped":
+                    self.dropped += 1
+                elif outcome == "coalesced":
+                    self.coalesced += 1
+        return event
+
+    def close(self):
+        """Cierra todas las suscripciones (usado al apagar la aplicación)."""
+        for subscription in list(self._subscriptions):
+            self.unsubscribe(subscription)
+
+    def stats(self) -> dict:
+        """Suscriptores activos, eventos pendientes y descartados (acumulados desde el inicio)."""
+        return {
+            "subscribers": len(self._subscriptions),
+            "published": self.published,
+            "pending": sum(len(s._events) for s in self._subscriptions),
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+        }
+
+
+event_hub = EventHub(
+    max_subscribers=settings.EVENTS_MAX_SUBSCRIBERS,
+    queue_size=settings.EVENTS_QUEUE_SIZE,
+    policy=settings.EVENTS_OVERFLOW_POLICY,
+)
+
+
+def account_payload(event_type: str, account: dict, changed: Optional[List[str]] = None) -> dict:
+    """Construye el cuerpo del evento a partir de un documento o modelo de cuenta."""
+    return {"type": event_type, "account": account, "changed": changed or []}
+
+
+def publish_account_change(event_type: str, account, changed: Optional[List[str]] = None):
+    """
+    Publica un cambio realizado por este proceso.
+    Si la fuente configurada es el change stream de MongoDB, los eventos llegan
+    desde allí y no se publican localmente para evitar duplicados.
+    """
+    if settings.EVENTS_SOURCE != "local":
+        return
+    event_hub.publish(event_type, account.id, account_payload(event_type, account.model_dump(), changed))
+
+
+async def watch_account_changes(database):
+    """
+    Publica en el hub los cambios de la colección 'acount' leídos desde un
+    change stream de MongoDB (solo disponible en replica sets).
+    """
+    resume_token = None
+    while True:
+        try:
+            async with database.acount.watch(
+                [{"$match": {"operationType": {"$in": ["insert", "update", "replace"]}}}],
+                full_document="updateLookup",
+                resume_after=resume_token
+            ) as stream:
+                async for change in stream:
+                    resume_token = stream.resume_token
+                    document = change.get("fullDocument")
+                    if document is None:
+                        continue
+                    document["id"] = str(document.pop("_id"))
+                    balance_from_storage(document)
+                    event_type = "account.created" if change["operationType"] == "insert" else "account.updated"
+                    updated_fields = change.get("updateDescription", {}).get("updatedFields", {})
+                    changed = ["balance" if field == MINOR_FIELD else field for field in updated_fields]
+                    event_hub.publish(event_type, document["id"], account_payload(event_type, document, changed))
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            print(f"Error en el change stream de cuentas, reintentando: {exc}")
+            await asyncio.sleep(1)
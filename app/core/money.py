@@ -0,0 +1,73 @@
+from decimal import Decimal, ROUND_HALF_EVEN
+from typing import Optional
+from bson.int64 import Int64
+from app.core.config import settings
+
+MINOR_FIELD = "balance_minor" # Saldo en unidades menores (p. ej. centavos) como int64
+
+def to_minor(amount: float, scale: Optional[int] = None) -> Int64:
+    """Convierte un monto decimal a unidades menores, redondeando al par más cercano."""
+    scale = settings.BALANCE_SCALE if scale is None else scale
+    # str() evita arrastrar el error binario del float (0.1 -> '0.1', no 0.1000000000000000055)
+    units = Decimal(str(amount)).scaleb(scale).quantize(Decimal(1), rounding=ROUND_HALF_EVEN)
+    return Int64(units)
+
+def from_minor(units: int, scale: Optional[int] = None) -> float:
+    """Convierte unidades menores al monto decimal que expone la API."""
+    scale = settings.BALANCE_SCALE if scale is None else scale
+    return float(Decimal(int(units)).scaleb(-scale))
+
+def uses_minor_units() -> bool:
+    """Indica si los saldos se almacenan como enteros en unidades menores."""
+    return settings.BALANCE_STORAGE == "minor_units"
+
+def balance_to_storage(document: dict) -> dict:
+    """Adapta el saldo de un documento nuevo al modo de almacenamiento configurado."""
+    if uses_minor_units():
+        document[MINOR_FIELD] = to_minor(document.pop("balance", 0.0))
+    return document
+
+def minor_from_float_expression(scale: Optional[int] = None) -> dict:
+    """Expresión de agregación: saldo float del documento en unidades menores (0 si no existe)."""
+    scale = settings.BALANCE_SCALE if scale is None else scale
+    return {"$toLong": {"$round": [
+        # $toDecimal usa la representación decimal corta del double (0.1 -> 0.1)
+        {"$multiply": [{"$toDecimal": {"$ifNull": ["$balance", 0]}}, 10 ** scale]}, 0
+    ]}}
+
+def balance_update_stage(amount: float, set_fields: dict) -> dict:
+    """
+    Etapa $set de un pipeline de actualización que suma 'amount' al saldo según el
+    formato de cada documento: si ya tiene 'balance_minor' (o el modo es minor_units)
+    el monto y cualquier 'balance' residual se suman en unidades menores y 'balance'
+    se elimina; si no, se suma al 'balance' float.
+    """
+    to_minor_units = True if uses_minor_units() else {"$ne": [{"$type": f"${MINOR_FIELD}"}, "missing"]}
+    stage = {field: {"$literal": value} for field, value in set_fields.items()}
+    stage[MINOR_FIELD] = {"$cond": [
+        to_minor_units,
+        {"$add": [{"$ifNull": [f"${MINOR_FIELD}", Int64(0)]}, minor_from_float_expression(), to_minor(amount)]},
+        "$$REMOVE"
+    ]}
+    stage["balance"] = {"$cond": [to_minor_units, "$$REMOVE", {"$add": [{"$ifNull": ["$balance", 0]}, amount]}]}
+    return {"$set": stage}
+
+def apply_balance_amount(document: dict, amount: float) -> dict:
+    """Equivalente en Python de balance_update_stage, para el repositorio en memoria."""
+    if uses_minor_units() or MINOR_FIELD in document:
+        residual = to_minor(document.pop("balance")) if "balance" in document else 0
+        document[MINOR_FIELD] = Int64(document.get(MINOR_FIELD, 0) + residual + to_minor(amount))
+    else:
+        document["balance"] = document.get("balance", 0) + amount
+    return document
+
+def balance_from_storage(document: dict) -> dict:
+    """
+    Expone el saldo como decimal sin importar cómo esté almacenado el documento.
+    Si un documento tiene ambos campos, el 'balance' residual se suma a 'balance_minor',
+    igual que en la próxima escritura o en la migración.
+    """
+    if MINOR_FIELD in document:
+        residual = to_minor(document["balance"]) if "balance" in document else 0
+        document["balance"] = from_minor(document.pop(MINOR_FIELD) + residual)
+    return document
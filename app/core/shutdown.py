@@ -0,0 +1,36 @@
+import asyncio
+import signal
+from typing import Callable
+
+def on_shutdown_signal(callback: Callable[[], None]) -> Callable[[], None]:
+    """
+    Ejecuta 'callback' en el event loop apenas el proceso recibe SIGINT/SIGTERM,
+    antes de que el servidor espere a que terminen las conexiones abiertas.
+    Se encadena con el manejador instalado por uvicorn, que sigue haciendo el apagado.
+    Devuelve una función que reinstala los manejadores anteriores.
+    """
+    loop = asyncio.get_running_loop()
+    installed = {}
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        previous = signal.getsignal(sig)
+        if not callable(previous):
+            continue # Sin manejador del servidor (p. ej. pruebas): nada que encadenar
+
+        def handler(signum, frame, previous=previous):
+            loop.call_soon_threadsafe(callback)
+            previous(signum, frame)
+
+        try:
+            signal.signal(sig, handler)
+        except ValueError:
+            break # Solo el hilo principal puede instalar manejadores (p. ej. TestClient)
+        installed[sig] = (handler, previous)
+
+    def restore():
+        for sig, (handler, previous) in installed.items():
+            # Si otro componente reemplazó el manejador después, se deja el suyo
+            if signal.getsignal(sig) is handler:
+                signal.signal(sig, previous)
+        installed.clear()
+
+    return restore
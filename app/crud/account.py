@@ -1,91 +1,74 @@
 from typing import List, Optional
 from bson import ObjectId
-from motor.motor_asyncio import AsyncIOMotorDatabase
+from app.core.events import publish_account_change
+from app.core.money import balance_from_storage, balance_to_storage
+from app.crud.repository import AccountRepository
 from app.models.account import Account
 from app.schemas.account import AccountCreate
 
 class AccountCRUD:
-    def __init__(self, database: AsyncIOMotorDatabase):
-        self.collection = database.acount # Accede a la colección 'acount'
+    def __init__(self, repository: AccountRepository):
+        self.repository = repository # MongoDB o memoria, según ACCOUNT_BACKEND
 
     async def create_account(self, account: AccountCreate) -> Account:
         """Crea una nueva cuenta bancaria."""
-        account_dict = account.model_dump()
-        result = await self.collection.insert_one(account_dict)
-        created_account = await self.collection.find_one({"_id": result.inserted_id})
-        # Convertir ObjectId a string para Pydantic
-        created_account["_id"] = str(created_account["_id"])
-        return Account(**created_account)
+        account_dict = balance_to_storage(account.model_dump())
+        created_account = await self.repository.insert(account_dict)
+        new_account = Account(**balance_from_storage(created_account))
+        publish_account_change("account.created", new_account)
+        return new_account
 
     async def get_all_accounts(self) -> List[Account]:
         """Obtiene todas las cuentas bancarias."""
-        accounts = []
-        async for account in self.collection.find():
-            # Convertir ObjectId a string para Pydantic
-            account["_id"] = str(account["_id"])
-            accounts.append(Account(**account))
-        return accounts
+        return [Account(**balance_from_storage(account)) for account in await self.repository.find_all()]
 
     async def get_account_by_id(self, account_id: str) -> Optional[Account]:
         """Obtiene una cuenta por su ID."""
         if not ObjectId.is_valid(account_id):
-            return None 
-        account = await self.collection.find_one({"_id": ObjectId(account_id)})
+            return None
+        account = await self.repository.find_by_id(account_id)
         if account:
-            # Convertir ObjectId a string para Pydantic
-            account["_id"] = str(account["_id"])
-            return Account(**account)
+            return Account(**balance_from_storage(account))
         return None
 
     async def update_account_balance(self, account_id: str, amount: float) -> Optional[Account]:
         """Actualiza el saldo de una cuenta. Agrega o resta la cantidad."""
         if not ObjectId.is_valid(account_id):
             return None
-        
+
         # Incrementar/Decrementar el saldo actual
-        result = await self.collection.find_one_and_update(
-            {"_id": ObjectId(account_id)},
-            {"$inc": {"balance": amount}}, # $inc para incrementar/decrementar
-            return_document=True # Devuelve el documento después de la actualización
-        )
+        result = await self.repository.update(account_id, {}, amount)
         if result:
-            # Convertir ObjectId a string para Pydantic
-            result["_id"] = str(result["_id"])
-            return Account(**result)
+            updated_account = Account(**balance_from_storage(result))
+            publish_account_change("account.updated", updated_account, ["balance"])
+            return updated_account
         return None
 
     async def update_account(self, account_id: str, update_data: dict) -> Optional[Account]:
         """Actualiza los campos especificados de una cuenta."""
         if not ObjectId.is_valid(account_id):
             return None
-        
-        # Construir el documento de actualización dinámicamente
-        update_doc = {}
+
+        # Construir la actualización dinámicamente
+        amount = None
         set_fields = {}
-        
+
         # Procesar todos los campos de actualización excepto 'amount'
         for field, value in update_data.items():
             if field == "amount" and value is not None:
                 # El amount se maneja como incremento/decremento del saldo
-                update_doc["$inc"] = {"balance": value}
+                amount = value
             elif value is not None and field != "amount":
                 set_fields[field] = value
-        
-        # Si hay campos para actualizar con $set
-        if set_fields:
-            update_doc["$set"] = set_fields
-        
+
         # Si no hay nada que actualizar, devolver None
-        if not update_doc:
+        if amount is None and not set_fields:
             return None
-        
-        result = await self.collection.find_one_and_update(
-            {"_id": ObjectId(account_id)},
-            update_doc,
-            return_document=True # Devuelve el documento después de la actualización
-        )
+
+        result = await self.repository.update(account_id, set_fields, amount)
         if result:
-            # Convertir ObjectId a string para Pydantic
-            result["_id"] = str(result["_id"])
-            return Account(**result)
-        return None
\ No newline at end of file
+            updated_account = Account(**balance_from_storage(result))
+            changed = list(set_fields) + (["balance"] if amount is not None else [])
+            publish_account_change("account.updated", updated_account, changed)
+            return updated_account
+        return None
@@ -0,0 +1,88 @@
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError, OperationFailure
+from app.core.config import settings
+
+TTL_INDEX_NAME = "idempotency_ttl"
+INDEX_OPTIONS_CONFLICT = 85 # Código de MongoDB: índice existente con otras opciones
+
+class IdempotencyCRUD:
+    def __init__(self, database: AsyncIOMotorDatabase):
+        self.collection = database.idempotency_keys # Accede a la colección 'idempotency_keys'
+
+    async def ensure_indexes(self):
+        """
+        Crea el índice TTL que elimina las claves vencidas. Si ya existe con otro
+        IDEMPOTENCY_TTL_SECONDS, actualiza el vencimiento con collMod.
+        """
+        try:
+            await self.collection.create_index(
+                "created_at",
+                expireAfterSeconds=settings.IDEMPOTENCY_TTL_SECONDS,
+                name=TTL_INDEX_NAME
+            )
+        except OperationFailure as exc:
+            if exc.code != INDEX_OPTIONS_CONFLICT:
+                raise
+            await self.collection.database.command(
+                "collMod",
+                self.collection.name,
+                index={"name": TTL_INDEX_NAME, "expireAfterSeconds": settings.IDEMPOTENCY_TTL_SECONDS}
+            )
+
+    async def reserve(self, key: str, fingerprint: str) -> Optional[dict]:
+        """
+        Reserva una clave marcándola como pendiente durante IDEMPOTENCY_LEASE_SECONDS.
+        Si la clave tiene una reserva pendiente vencida (p. ej. el proceso que la tomó
+        terminó sin completarla) y la misma huella, la reserva pasa a esta solicitud.
+        Devuelve None si la reserva fue exitosa o el documento existente si la clave ya fue usada.
+        """
+        now = datetime.now(timezone.utc)
+        locked_until = now + timedelta(seconds=settings.IDEMPOTENCY_LEASE_SECONDS)
+        try:
+            await self.collection.insert_one({
+                "_id": key,
+                "fingerprint": fingerprint,
+                "status": "pending",
+                "locked_until": locked_until,
+                "created_at": now
+            })
+            return None
+        except DuplicateKeyError:
+            pass
+        taken = await self.collection.find_one_and_update(
+            # Sin 'locked_until' (reservas anteriores al vencimiento) también se considera vencida
+            {"_id": key, "status": "pending", "fingerprint": fingerprint, "locked_until": {"$not": {"$gt": now}}},
+            {"$set": {"locked_until": locked_until, "created_at": now}},
+            return_document=ReturnDocument.AFTER
+        )
+        if taken is not None:
+            return None
+        return await self.collection.find_one({"_id": key})
+
+    @staticmethod
+    def lease_expired(document: dict) -> bool:
+        """Indica si la reserva pendiente de un documento ya venció."""
+        locked_until = document.get("locked_until")
+        if locked_until is None:
+            return True
+        if locked_until.tzinfo is None:
+            locked_until = locked_until.replace(tzinfo=timezone.utc) # PyMongo devuelve UTC sin zona
+        return locked_until <= datetime.now(timezone.utc)
+
+    async def get(self, key: str) -> Optional[dict]:
+        """Obtiene el registro de una clave."""
+        return await self.collection.find_one({"_id": key})
+
+    async def complete(self, key: str, status_code: int, body):
+        """Guarda la respuesta final asociada a la clave."""
+        await self.collection.update_one(
+            {"_id": key},
+            {"$set": {"status": "completed", "status_code": status_code, "body": body}}
+        )
+
+    async def release(self, key: str):
+        """Libera una clave pendiente para que la solicitud pueda reintentarse."""
+        await self.collection.delete_one({"_id": key, "status": "pending"})
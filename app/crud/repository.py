@@ -0,0 +1,115 @@
+from abc import ABC, abstractmethod
+from enum import Enum
+from typing import Dict, List, Optional
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from app.core.money import apply_balance_amount, balance_update_stage
+
+class AccountRepository(ABC):
+    """
+    Almacenamiento de documentos de cuentas. Los documentos se devuelven con
+    '_id' como string; los IDs recibidos ya fueron validados como ObjectId.
+    """
+
+    @abstractmethod
+    async def insert(self, document: dict) -> dict:
+        """Inserta un documento y devuelve el documento almacenado."""
+
+    @abstractmethod
+    async def find_all(self) -> List[dict]:
+        """Obtiene todos los documentos en orden de inserción."""
+
+    @abstractmethod
+    async def find_by_id(self, account_id: str) -> Optional[dict]:
+        """Obtiene un documento por su ID."""
+
+    @abstractmethod
+    async def update(self, account_id: str, set_fields: dict, amount: Optional[float] = None) -> Optional[dict]:
+        """
+        Aplica $set y suma 'amount' al saldo de forma atómica, en el campo de saldo
+        que use el documento; devuelve el documento actualizado.
+        """
+
+    @abstractmethod
+    async def delete_all(self):
+        """Elimina todos los documentos."""
+
+class MongoAccountRepository(AccountRepository):
+    def __init__(self, database: AsyncIOMotorDatabase):
+        self.collection = database.acount # Accede a la colección 'acount'
+
+    async def insert(self, document: dict) -> dict:
+        result = await self.collection.insert_one(document)
+        created = await self.collection.find_one({"_id": result.inserted_id})
+        # Convertir ObjectId a string para Pydantic
+        created["_id"] = str(created["_id"])
+        return created
+
+    async def find_all(self) -> List[dict]:
+        documents = []
+        async for document in self.collection.find():
+            document["_id"] = str(document["_id"])
+            documents.append(document)
+        return documents
+
+    async def find_by_id(self, account_id: str) -> Optional[dict]:
+        document = await self.collection.find_one({"_id": ObjectId(account_id)})
+        if document:
+            document["_id"] = str(document["_id"])
+        return document
+
+    async def update(self, account_id: str, set_fields: dict, amount: Optional[float] = None) -> Optional[dict]:
+        if amount is not None:
+            # Pipeline: el campo del saldo se elige según el documento, no según el modo global
+            update_doc = [balance_update_stage(amount, set_fields)]
+        else:
+            update_doc = {"$set": set_fields}
+        document = await self.collection.find_one_and_update(
+            {"_id": ObjectId(account_id)},
+            update_doc,
+            return_document=True # Devuelve el documento después de la actualización
+        )
+        if document:
+            document["_id"] = str(document["_id"])
+        return document
+
+    async def delete_all(self):
+        await self.collection.delete_many({})
+
+def _stored_value(value):
+    """Valor tal como lo devolvería MongoDB: los Enum se guardan como su valor en BSON."""
+    return value.value if isinstance(value, Enum) else value
+
+class InMemoryAccountRepository(AccountRepository):
+    """Implementación en memoria con la misma semántica que MongoDB (IDs ObjectId, saldo y $set)."""
+
+    def __init__(self):
+        self._documents: Dict[str, dict] = {}
+
+    async def insert(self, document: dict) -> dict:
+        stored = {field: _stored_value(value) for field, value in document.items()}
+        stored["_id"] = str(ObjectId())
+        self._documents[stored["_id"]] = stored
+        return dict(stored)
+
+    async def find_all(self) -> List[dict]:
+        return [dict(document) for document in self._documents.values()]
+
+    async def find_by_id(self, account_id: str) -> Optional[dict]:
+        document = self._documents.get(account_id)
+        return dict(document) if document is not None else None
+
+    async def update(self, account_id: str, set_fields: dict, amount: Optional[float] = None) -> Optional[dict]:
+        document = self._documents.get(account_id)
+        if document is None:
+            return None
+        if amount is not None:
+            apply_balance_amount(document, amount)
+        document.update({field: _stored_value(value) for field, value in set_fields.items()})
+        return dict(document)
+
+    async def delete_all(self):
+        self._documents.clear()
+
+# Almacén compartido por todas las solicitudes cuando ACCOUNT_BACKEND=memory
+memory_account_repository = InMemoryAccountRepository()
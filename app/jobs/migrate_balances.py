@@ -0,0 +1,80 @@
+"""
+Migra los saldos float ('balance') a unidades menores int64 ('balance_minor').
+Los documentos que ya tienen 'balance_minor' y conservan un 'balance' residual
+(escrito por versiones anteriores) también se procesan: el residuo se suma.
+
+La conversión se hace en el servidor con un pipeline de actualización por lotes
+de _id, de modo que cada documento se convierte a partir de su valor actual
+(sin carreras con las actualizaciones de saldo concurrentes) y sin traer los saldos a Python.
+
+Uso:
+    python -m app.jobs.migrate_balances                 # migra todo en lotes de 1000
+    python -m app.jobs.migrate_balances --dry-run       # solo cuenta los pendientes
+    python -m app.jobs.migrate_balances --batch-size 5000
+
+Después de migrar, iniciar la API con BALANCE_STORAGE=minor_units.
+"""
+import argparse
+import asyncio
+from bson.int64 import Int64
+from app.core.config import settings
+from app.core.database import db
+from app.core.money import MINOR_FIELD, minor_from_float_expression
+
+# Todo documento con saldo float, migrado o no
+PENDING_FILTER = {"balance": {"$exists": True}}
+
+def conversion_pipeline(scale: int) -> list:
+    """Pipeline de actualización: balance (double) se suma a balance_minor (long), redondeo al par."""
+    return [
+        {"$set": {MINOR_FIELD: {"$add": [
+            {"$ifNull": [f"${MINOR_FIELD}", Int64(0)]}, minor_from_float_expression(scale)
+        ]}}},
+        {"$unset": "balance"},
+    ]
+
+async def migrate(collection, batch_size: int, scale: int, dry_run: bool = False) -> dict:
+    """Convierte los documentos pendientes en lotes ordenados por _id."""
+    pending = await collection.count_documents(PENDING_FILTER)
+    if dry_run:
+        return {"pending": pending, "migrated": 0, "batches": 0}
+
+    pipeline = conversion_pipeline(scale)
+    migrated = 0
+    batches = 0
+    last_id = None
+    while True:
+        batch_filter = dict(PENDING_FILTER)
+        if last_id is not None:
+            batch_filter["_id"] = {"$gt": last_id}
+        ids = [document["_id"] async for document in
+               collection.find(batch_filter, {"_id": 1}).sort("_id", 1).limit(batch_size)]
+        if not ids:
+            break
+        # Se repite el filtro de pendientes para que el lote sea idempotente
+        result = await collection.update_many({"_id": {"$in": ids}, **PENDING_FILTER}, pipeline)
+        migrated += result.modified_count
+        batches += 1
+        last_id = ids[-1]
+        print(f"Lote {batches}: {result.modified_count} documentos migrados ({migrated}/{pending})")
+    return {"pending": pending, "migrated": migrated, "batches": batches}
+
+async def main(args):
+    await db.connect()
+    try:
+        summary = await migrate(db.database.acount, args.batch_size, settings.BALANCE_SCALE, args.dry_run)
+    finally:
+        await db.close()
+    if args.dry_run:
+        print(f"Documentos pendientes de migrar: {summary['pending']}")
+    else:
+        print(f"Migración completa: {summary['migrated']} documentos en {summary['batches']} lotes")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Migra los saldos a unidades menores int64")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Documentos por lote")
+    parser.add_argument("--dry-run", action="store_true", help="Solo reporta cuántos documentos faltan")
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
@@ -0,0 +1,103 @@
+"""
+Conciliación de saldos: calcula los totales por tipo de cuenta con un pipeline de
+agregación (la suma se hace en el servidor, sin recorrer documentos en Python) y
+detecta los saldos float con deriva de redondeo.
+
+Uso:
+    python -m app.jobs.reconcile_balances               # reporte
+    python -m app.jobs.reconcile_balances --fix-drift   # redondea en el servidor los saldos float con deriva
+"""
+import argparse
+import asyncio
+import json
+from bson.decimal128 import Decimal128
+from app.core.config import settings
+from app.core.database import db
+from app.core.money import MINOR_FIELD, from_minor
+
+def float_minor_expression(scale: int) -> dict:
+    """Saldo float de un documento sin migrar, redondeado a unidades menores (decimal exacto)."""
+    return {"$round": [{"$multiply": [{"$toDecimal": {"$ifNull": ["$balance", 0]}}, 10 ** scale]}, 0]}
+
+def minor_units_expression(scale: int) -> dict:
+    """Saldo de cada documento en unidades menores, migrado o no (incluye el 'balance' residual)."""
+    return {"$add": [{"$toDecimal": {"$ifNull": [f"${MINOR_FIELD}", 0]}}, float_minor_expression(scale)]}
+
+def drift_expression(scale: int) -> dict:
+    """Verdadero si el saldo float tiene más decimales de los que admite la moneda."""
+    return {"$and": [
+        {"$eq": [{"$type": "$balance"}, "double"]},
+        {"$ne": ["$balance", {"$round": ["$balance", scale]}]}
+    ]}
+
+def totals_pipeline(scale: int) -> list:
+    """Totales, conteos y deriva agrupados por tipo de cuenta."""
+    is_migrated = {"$ne": [{"$type": f"${MINOR_FIELD}"}, "missing"]}
+    has_float = {"$ne": [{"$type": "$balance"}, "missing"]}
+    return [
+        {"$group": {
+            "_id": "$account_type",
+            "accounts": {"$sum": 1},
+            "total_minor": {"$sum": minor_units_expression(scale)},
+            "migrated": {"$sum": {"$cond": [is_migrated, 1, 0]}},
+            # Migrados que conservan un 'balance' residual (se suma en el total)
+            "mixed": {"$sum": {"$cond": [{"$and": [is_migrated, has_float]}, 1, 0]}},
+            "drifted": {"$sum": {"$cond": [drift_expression(scale), 1, 0]}},
+            # Saldos float: suma float directa frente a la suma exacta de centavos
+            "float_total": {"$sum": {"$ifNull": ["$balance", 0]}},
+            "float_minor": {"$sum": float_minor_expression(scale)},
+        }},
+        {"$sort": {"_id": 1}},
+    ]
+
+def _as_int(value) -> int:
+    """Convierte el resultado de $sum (Decimal128 o entero) a int."""
+    return int(value.to_decimal()) if isinstance(value, Decimal128) else int(value)
+
+async def reconcile(collection, scale: int) -> dict:
+    """Ejecuta la agregación y arma el reporte con los montos en decimales."""
+    groups = []
+    total_minor = 0
+    async for group in collection.aggregate(totals_pipeline(scale)):
+        minor = _as_int(group["total_minor"])
+        total_minor += minor
+        groups.append({
+            "account_type": group["_id"],
+            "accounts": group["accounts"],
+            "migrated": group["migrated"],
+            "drifted": group["drifted"],
+            "mixed": group["mixed"],
+            "total_minor": minor,
+            "total": from_minor(minor, scale),
+            # Deriva acumulada por sumar floats en lugar de unidades menores
+            "float_sum_error": group["float_total"] - from_minor(_as_int(group["float_minor"]), scale),
+        })
+    return {"groups": groups, "total_minor": total_minor, "total": from_minor(total_minor, scale)}
+
+async def fix_drift(collection, scale: int) -> int:
+    """Redondea en el servidor los saldos float que acumularon deriva."""
+    result = await collection.update_many(
+        {"$expr": drift_expression(scale)},
+        [{"$set": {"balance": {"$round": ["$balance", scale]}}}]
+    )
+    return result.modified_count
+
+async def main(args):
+    await db.connect()
+    try:
+        collection = db.database.acount
+        if args.fix_drift:
+            fixed = await fix_drift(collection, settings.BALANCE_SCALE)
+            print(f"Saldos con deriva corregidos: {fixed}")
+        report = await reconcile(collection, settings.BALANCE_SCALE)
+    finally:
+        await db.close()
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Concilia los saldos con un pipeline de agregación")
+    parser.add_argument("--fix-drift", action="store_true", help="Redondea los saldos float con deriva antes del reporte")
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
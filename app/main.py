@@ -1,16 +1,35 @@
+import asyncio
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.exceptions import RequestValidationError
 from fastapi.responses import RedirectResponse
+from app.core.config import settings
 from app.core.database import db
-from app.api.endpoints import acounts
+from app.core.errors import validation_exception_handler
+from app.core.events import event_hub, watch_account_changes
+from app.core.shutdown import on_shutdown_signal
+from app.crud.idempotency import IdempotencyCRUD
+from app.api.endpoints import acounts, metrics
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Maneja los eventos de inicio y cierre de la aplicación."""
-    # Startup
-    await db.connect()
+    # Startup (se ejecuta en cada proceso worker, después de crearlo)
+    watcher = None
+    if settings.ACCOUNT_BACKEND == "mongo":
+        await db.connect()
+        await IdempotencyCRUD(db.database).ensure_indexes()
+        if settings.EVENTS_SOURCE == "change_stream":
+            watcher = asyncio.create_task(watch_account_changes(db.database))
+    # Al recibir la señal de apagado se cierran los flujos SSE para que no retrasen
+    # el drenado de las solicitudes en curso
+    restore_signal_handlers = on_shutdown_signal(event_hub.close)
     yield
     # Shutdown
+    restore_signal_handlers() # Cada ejecución del lifespan deja los manejadores como los encontró
+    if watcher:
+        watcher.cancel()
+    event_hub.close() # Termina los flujos SSE abiertos
     await db.close()
 
 app = FastAPI(
@@ -22,7 +41,10 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+app.add_exception_handler(RequestValidationError, validation_exception_handler)
+
 app.include_router(acounts.router)
+app.include_router(metrics.router)
 
 @app.get("/", include_in_schema=False)
 async def redirect_to_docs():
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field, ConfigDict, field_validator
-from typing import Optional
+from pydantic import BaseModel, Field, ConfigDict, StringConstraints, model_validator
+from typing import Annotated, Optional
 from enum import Enum
 
 class DocumentType(str, Enum):
@@ -9,6 +9,19 @@ class DocumentType(str, Enum):
     PP = "PP"  # Pasaporte
     NIT = "NIT"  # Número de Identificación Tributaria
 
+# Restricciones declarativas: pydantic-core las aplica sin ejecutar código Python.
+# Los mensajes en español se generan en app.core.errors a partir del tipo de error.
+CustomerName = Annotated[str, StringConstraints(min_length=3, max_length=100)]
+DocumentNumber = Annotated[str, StringConstraints(strip_whitespace=True, min_length=3, max_length=20)]
+Phone = Annotated[str, StringConstraints(strip_whitespace=True, min_length=7, max_length=20)]
+Email = Annotated[str, StringConstraints(strip_whitespace=True, to_lower=True, min_length=5, max_length=100, pattern=r"@")]
+Address = Annotated[str, StringConstraints(strip_whitespace=True, min_length=10, max_length=200)]
+# Montos finitos y acotados: 1e13 conserva los centavos exactos en un float (2^53 / 100 ≈ 9e13)
+# y cabe holgadamente en int64 al guardarse en unidades menores
+MAX_AMOUNT = 1e13
+Balance = Annotated[float, Field(ge=0.0, le=MAX_AMOUNT, allow_inf_nan=False)]
+Amount = Annotated[float, Field(ge=-MAX_AMOUNT, le=MAX_AMOUNT, allow_inf_nan=False)]
+
 class AccountCreate(BaseModel):
     model_config = ConfigDict(
         json_schema_extra = {
@@ -34,7 +47,7 @@ class AccountCreate(BaseModel):
         ...,
         description="Tipo de cuenta (savings, checking, etc.)"
     )
-    customer_name: str = Field(
+    customer_name: CustomerName = Field(
         ..., 
         description="Nombre completo del titular de la cuenta (mínimo 3 caracteres)"
     )
@@ -42,80 +55,26 @@ class AccountCreate(BaseModel):
         ...,
         description="Tipo de documento de identificación"
     )
-    document_number: str = Field(
+    document_number: DocumentNumber = Field(
         ...,
         description="Número de documento de identificación"
     )
-    phone: str = Field(
+    phone: Phone = Field(
         ...,
         description="Número de teléfono del titular"
     )
-    email: str = Field(
+    email: Email = Field(
         ...,
         description="Correo electrónico del titular"
     )
-    address: str = Field(
+    address: Address = Field(
         ...,
         description="Dirección de residencia del titular"
     )
-    balance: float = Field(
+    balance: Balance = Field(
         default=0.0, 
         description="Saldo inicial de la cuenta (debe ser mayor o igual a 0)"
     )
-    
-    @field_validator('customer_name')
-    @classmethod
-    def validate_customer_name(cls, v):
-        if len(v) < 3:
-            raise ValueError('El nombre del titular debe tener al menos 3 caracteres')
-        if len(v) > 100:
-            raise ValueError('El nombre del titular no puede tener más de 100 caracteres')
-        return v
-    
-    @field_validator('document_number')
-    @classmethod
-    def validate_document_number(cls, v):
-        if len(v) < 3:
-            raise ValueError('El número de documento debe tener al menos 3 caracteres')
-        if len(v) > 20:
-            raise ValueError('El número de documento no puede tener más de 20 caracteres')
-        return v.strip()
-    
-    @field_validator('phone')
-    @classmethod
-    def validate_phone(cls, v):
-        if len(v) < 7:
-            raise ValueError('El teléfono debe tener al menos 7 caracteres')
-        if len(v) > 20:
-            raise ValueError('El teléfono no puede tener más de 20 caracteres')
-        return v.strip()
-    
-    @field_validator('email')
-    @classmethod
-    def validate_email(cls, v):
-        if '@' not in v:
-            raise ValueError('El email debe tener un formato válido')
-        if len(v) < 5:
-            raise ValueError('El email debe tener al menos 5 caracteres')
-        if len(v) > 100:
-            raise ValueError('El email no puede tener más de 100 caracteres')
-        return v.lower().strip()
-    
-    @field_validator('address')
-    @classmethod
-    def validate_address(cls, v):
-        if len(v) < 10:
-            raise ValueError('La dirección debe tener al menos 10 caracteres')
-        if len(v) > 200:
-            raise ValueError('La dirección no puede tener más de 200 caracteres')
-        return v.strip()
-    
-    @field_validator('balance')
-    @classmethod
-    def validate_balance(cls, v):
-        if v < 0:
-            raise ValueError('El saldo no puede ser negativo')
-        return v
 
 class AccountUpdate(BaseModel):
     model_config = ConfigDict(
@@ -142,7 +101,7 @@ class AccountUpdate(BaseModel):
         None,
         description="Nuevo tipo de cuenta (opcional)"
     )
-    customer_name: Optional[str] = Field(
+    customer_name: Optional[CustomerName] = Field(
         None, 
         description="Nuevo nombre del titular de la cuenta (opcional)"
     )
@@ -150,88 +109,33 @@ class AccountUpdate(BaseModel):
         None,
         description="Nuevo tipo de documento de identificación (opcional)"
     )
-    document_number: Optional[str] = Field(
+    document_number: Optional[DocumentNumber] = Field(
         None,
         description="Nuevo número de documento de identificación (opcional)"
     )
-    phone: Optional[str] = Field(
+    phone: Optional[Phone] = Field(
         None,
         description="Nuevo número de teléfono del titular (opcional)"
     )
-    email: Optional[str] = Field(
+    email: Optional[Email] = Field(
         None,
         description="Nuevo correo electrónico del titular (opcional)"
     )
-    address: Optional[str] = Field(
+    address: Optional[Address] = Field(
         None,
         description="Nueva dirección de residencia del titular (opcional)"
     )
-    amount: Optional[float] = Field(
-        None, 
+    amount: Optional[Amount] = Field(
+        None,
         description="Cantidad a agregar o restar del saldo (opcional)"
     )
     
-    @field_validator('customer_name')
-    @classmethod
-    def validate_customer_name(cls, v):
-        if v is not None:
-            if len(v) < 3:
-                raise ValueError('El nombre del titular debe tener al menos 3 caracteres')
-            if len(v) > 100:
-                raise ValueError('El nombre del titular no puede tener más de 100 caracteres')
-        return v
-    
-    @field_validator('document_number')
-    @classmethod
-    def validate_document_number(cls, v):
-        if v is not None:
-            if len(v) < 3:
-                raise ValueError('El número de documento debe tener al menos 3 caracteres')
-            if len(v) > 20:
-                raise ValueError('El número de documento no puede tener más de 20 caracteres')
-        return v.strip() if v else v
-    
-    @field_validator('phone')
-    @classmethod
-    def validate_phone(cls, v):
-        if v is not None:
-            if len(v) < 7:
-                raise ValueError('El teléfono debe tener al menos 7 caracteres')
-            if len(v) > 20:
-                raise ValueError('El teléfono no puede tener más de 20 caracteres')
-        return v.strip() if v else v
-    
-    @field_validator('email')
-    @classmethod
-    def validate_email(cls, v):
-        if v is not None:
-            if '@' not in v:
-                raise ValueError('El email debe tener un formato válido')
-            if len(v) < 5:
-                raise ValueError('El email debe tener al menos 5 caracteres')
-            if len(v) > 100:
-                raise ValueError('El email no puede tener más de 100 caracteres')
-        return v.lower().strip() if v else v
-    
-    @field_validator('address')
-    @classmethod
-    def validate_address(cls, v):
-        if v is not None:
-            if len(v) < 10:
-                raise ValueError('La dirección debe tener al menos 10 caracteres')
-            if len(v) > 200:
-                raise ValueError('La dirección no puede tener más de 200 caracteres')
-        return v.strip() if v else v
-    
-    def model_post_init(self, __context):
-        """Valida que al menos un campo sea proporcionado después de la inicialización."""
-        fields_to_check = [
-            self.account_number, self.account_type, self.customer_name, 
-            self.document_type, self.document_number,
-            self.phone, self.email, self.address, self.amount
-        ]
-        if all(field is None for field in fields_to_check):
+    @model_validator(mode='after')
+    def validate_at_least_one_field(self):
+        """Valida que al menos un campo tenga valor (solo revisa los campos enviados)."""
+        if all(getattr(self, field) is None for field in self.model_fields_set):
             raise ValueError('Debe proporcionar al menos un campo para actualizar')
+        return self
 
 class AccountResponse(BaseModel):
     model_config = ConfigDict(
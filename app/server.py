@@ -0,0 +1,49 @@
+"""
+Punto de entrada del servidor con soporte para varios procesos worker.
+
+Uso:
+    python -m app.server                      # según Settings / variables de entorno
+    WEB_CONCURRENCY=4 python -m app.server    # 4 workers
+    WEB_CONCURRENCY=0 python -m app.server    # un worker por núcleo
+
+Cada worker importa la aplicación y ejecuta su propio lifespan, por lo que crea
+su cliente de MongoDB (con MONGODB_MAX_POOL_SIZE conexiones) después de iniciar
+el proceso. Ningún cliente se comparte entre procesos.
+"""
+import os
+import uvicorn
+from app.core.config import settings
+
+def worker_count() -> int:
+    """Cantidad de workers configurada; 0 significa uno por núcleo disponible."""
+    if settings.WEB_CONCURRENCY > 0:
+        return settings.WEB_CONCURRENCY
+    return len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1)
+
+def main():
+    workers = worker_count()
+    if workers > 1 and settings.ACCOUNT_BACKEND == "memory":
+        raise SystemExit("ACCOUNT_BACKEND=memory no admite varios workers: cada proceso tendría datos distintos")
+    if workers > 1 and settings.EVENTS_SOURCE == "local":
+        print(
+            "Aviso: con varios workers y EVENTS_SOURCE=local cada flujo SSE solo recibe los cambios "
+            "hechos en su propio proceso; use EVENTS_SOURCE=change_stream para verlos todos."
+        )
+    print(
+        f"Iniciando {workers} worker(s) en {settings.SERVER_HOST}:{settings.SERVER_PORT} "
+        f"(pool de MongoDB por worker: {settings.MONGODB_MAX_POOL_SIZE})"
+    )
+    uvicorn.run(
+        "app.main:app",
+        host=settings.SERVER_HOST,
+        port=settings.SERVER_PORT,
+        workers=workers,
+        loop=settings.SERVER_LOOP,
+        http=settings.SERVER_HTTP,
+        backlog=settings.SERVER_BACKLOG,
+        access_log=settings.SERVER_ACCESS_LOG,
+        timeout_graceful_shutdown=settings.GRACEFUL_SHUTDOWN_TIMEOUT,
+    )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, NamedTuple, Optional
+from fastapi import HTTPException, status
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from app.core.config import settings
+from app.crud.idempotency import IdempotencyCRUD
+
+class StoredResponse(NamedTuple):
+    fingerprint: str
+    status_code: int
+    body: object
+
+class IdempotencyCache:
+    """Caché en memoria (LRU con vencimiento) y registro de solicitudes en curso del proceso."""
+
+    def __init__(self, max_size: int, ttl_seconds: int):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self.in_flight: Dict[str, asyncio.Future] = {}
+
+    def get(self, key: str) -> Optional[StoredResponse]:
+        """Obtiene una respuesta guardada si no ha vencido."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, stored = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return stored
+
+    def put(self, key: str, stored: StoredResponse):
+        """Guarda una respuesta, descartando la menos usada si se supera el tamaño máximo."""
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, stored)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        """Vacía la caché."""
+        self._entries.clear()
+
+idempotency_cache = IdempotencyCache(settings.IDEMPOTENCY_CACHE_SIZE, settings.IDEMPOTENCY_TTL_SECONDS)
+
+def request_fingerprint(payload: BaseModel) -> str:
+    """Huella del cuerpo de la solicitud para detectar claves reutilizadas con otros datos."""
+    canonical = json.dumps(payload.model_dump(mode="json"), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+class IdempotencyService:
+    def __init__(self, idempotency_crud: Optional[IdempotencyCRUD], cache: IdempotencyCache = idempotency_cache):
+        self.idempotency_crud = idempotency_crud
+        self.cache = cache
+
+    async def execute(
+        self,
+        key: str,
+        fingerprint: str,
+        operation: Callable[[], Awaitable[BaseModel]],
+        status_code: int = status.HTTP_200_OK
+    ):
+        """
+        Ejecuta la operación una sola vez por clave.
+        Los reintentos reciben la respuesta guardada sin volver a ejecutarla y los
+        duplicados concurrentes esperan el resultado de la solicitud original.
+        """
+        stored = self.cache.get(key)
+        if stored is not None:
+            return self._replay(stored, fingerprint)
+
+        in_flight = self.cache.in_flight.get(key)
+        if in_flight is not None:
+            try:
+                # shield: al vencer la espera solo se abandona este duplicado, no la original
+                stored = await asyncio.wait_for(asyncio.shield(in_flight), settings.IDEMPOTENCY_WAIT_TIMEOUT)
+            except asyncio.TimeoutError:
+                raise self._in_progress_conflict()
+            return self._replay(stored, fingerprint)
+
+        future = asyncio.get_running_loop().create_future()
+        self.cache.in_flight[key] = future
+        try:
+            stored, result = await self._run(key, fingerprint, operation, status_code)
+        except asyncio.CancelledError:
+            # Los duplicados no fueron cancelados: reciben un 409 para que reintenten
+            future.set_exception(HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="La solicitud original con esta clave de idempotencia se interrumpió, reintente",
+                headers={"Retry-After": "1"}
+            ))
+            future.exception() # Evita el aviso de excepción no recuperada si nadie espera
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            future.exception() # Evita el aviso de excepción no recuperada si nadie espera
+            raise
+        finally:
+            self.cache.in_flight.pop(key, None)
+        future.set_result(stored)
+        self.cache.put(key, stored)
+        if result is not None:
+            return result # Respuesta original, FastAPI aplica el response_model
+        return self._replay(stored, fingerprint)
+
+    async def _run(self, key, fingerprint, operation, status_code):
+        """
+        Reserva la clave en la colección y ejecuta la operación original.
+        Devuelve la respuesta guardada y el modelo resultante (None si la clave ya había sido usada).
+        """
+        if self.idempotency_crud is not None:
+            while True:
+                existing = await self.idempotency_crud.reserve(key, fingerprint)
+                if existing is None:
+                    break
+                # La clave ya fue usada, posiblemente por otro proceso
+                stored = await self._wait_for_completion(key, existing, fingerprint)
+                if stored is not None:
+                    return stored, None
+                # La reserva del otro proceso venció sin completarse: se intenta tomarla
+
+        try:
+            result = await operation()
+        except BaseException:
+            if self.idempotency_crud is not None:
+                await self.idempotency_crud.release(key)
+            raise
+
+        body = result.model_dump(mode="json")
+        if self.idempotency_crud is not None:
+            await self.idempotency_crud.complete(key, status_code, body)
+        return StoredResponse(fingerprint, status_code, body), result
+
+    async def _wait_for_completion(self, key: str, document: dict, fingerprint: str) -> Optional[StoredResponse]:
+        """
+        Espera a que otra instancia complete la solicitud original.
+        Devuelve None si la reserva pendiente venció y puede tomarse.
+        """
+        deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_TIMEOUT
+        while document is not None and document.get("status") == "pending":
+            if document["fingerprint"] != fingerprint:
+                raise HTTPException(
+                    status_code=422,
+                    detail="La clave de idempotencia ya fue usada con una solicitud diferente"
+                )
+            if self.idempotency_crud.lease_expired(document):
+                return None
+            if time.monotonic() >= deadline:
+                raise self._in_progress_conflict()
+            await asyncio.sleep(0.05)
+            document = await self.idempotency_crud.get(key)
+        if document is None:
+            # La solicitud original falló y liberó la clave
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="La solicitud original con esta clave de idempotencia falló, reintente",
+                headers={"Retry-After": "1"}
+            )
+        return StoredResponse(document["fingerprint"], document["status_code"], document["body"])
+
+    @staticmethod
+    def _in_progress_conflict() -> HTTPException:
+        """Error para un duplicado cuya solicitud original no terminó dentro del plazo de espera."""
+        return HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Hay una solicitud en proceso con la misma clave de idempotencia",
+            headers={"Retry-After": "1"}
+        )
+
+    def _replay(self, stored: StoredResponse, fingerprint: str) -> JSONResponse:
+        """Devuelve la respuesta guardada verificando que la solicitud sea la misma."""
+        if stored.fingerprint != fingerprint:
+            raise HTTPException(
+                status_code=422,
+                detail="La clave de idempotencia ya fue usada con una solicitud diferente"
+            )
+        return JSONResponse(
+            status_code=stored.status_code,
+            content=stored.body,
+            headers={"Idempotent-Replayed": "true"}
+        )
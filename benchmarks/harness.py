@@ -0,0 +1,134 @@
+import inspect
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+def _measure_sync(function: Callable, min_time: float) -> float:
+    """Ejecuta la función en lotes crecientes hasta cubrir min_time; devuelve ops/seg."""
+    batch = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(batch):
+            function()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            return batch / elapsed
+        batch *= 2
+
+async def _measure_async(function: Callable, min_time: float) -> float:
+    """Equivalente asíncrono de _measure_sync."""
+    batch = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(batch):
+            await function()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            return batch / elapsed
+        batch *= 2
+
+async def _allocations(function: Callable, is_async: bool, samples: int) -> Dict[str, float]:
+    """Memoria máxima asignada durante una operación y memoria retenida, promediadas."""
+    tracemalloc.start()
+    try:
+        peak_total = 0
+        start_current, _ = tracemalloc.get_traced_memory()
+        for _ in range(samples):
+            before, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            if is_async:
+                await function()
+            else:
+                function()
+            _, peak = tracemalloc.get_traced_memory()
+            peak_total += peak - before
+        end_current, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "alloc_peak_bytes_per_op": peak_total / samples,
+        "retained_bytes_per_op": (end_current - start_current) / samples,
+    }
+
+async def run_case(name: str, function: Callable, min_time: float, repeat: int, alloc_samples: int) -> dict:
+    """
+    Mide un caso (función síncrona o asíncrona sin argumentos).
+    Una función que devuelve un awaitable (p. ej. una lambda que llama a una corrutina)
+    se mide como asíncrona: se espera su resultado en cada operación.
+    """
+    is_async = inspect.iscoroutinefunction(function)
+    if not is_async:
+        result = function()
+        if inspect.isawaitable(result):
+            await result
+            is_async = True
+    # Calentamiento para cachés internas y validadores compilados
+    for _ in range(10):
+        if is_async:
+            await function()
+        else:
+            function()
+    rates: List[float] = []
+    for _ in range(repeat):
+        if is_async:
+            rates.append(await _measure_async(function, min_time))
+        else:
+            rates.append(_measure_sync(function, min_time))
+    result = {"name": name, "ops_per_sec": max(rates), "ops_per_sec_runs": rates}
+    result.update(await _allocations(function, is_async, alloc_samples))
+    return result
+
+def environment() -> dict:
+    """Datos del entorno para interpretar las líneas base."""
+    import pydantic
+    return {
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "pydantic": pydantic.VERSION,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+    }
+
+def save_results(path: str, results: List[dict], metadata: dict):
+    """Guarda los resultados como línea base en JSON."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as handle:
+        json.dump({"environment": environment(), "metadata": metadata, "results": results}, handle, indent=2)
+
+def load_results(path: str) -> Dict[str, dict]:
+    """Carga una línea base indexada por nombre de caso."""
+    with open(path, encoding="utf-8") as handle:
+        return {result["name"]: result for result in json.load(handle)["results"]}
+
+def compare(results: List[dict], baseline: Dict[str, dict], threshold: float) -> List[str]:
+    """Imprime la comparación con la línea base y devuelve los casos que empeoraron."""
+    regressions = []
+    print(f"\n{'caso':<40} {'base ops/s':>14} {'actual ops/s':>14} {'cambio':>9}")
+    for result in results:
+        base: Optional[dict] = baseline.get(result["name"])
+        if base is None:
+            print(f"{result['name']:<40} {'-':>14} {result['ops_per_sec']:>14,.0f} {'nuevo':>9}")
+            continue
+        change = result["ops_per_sec"] / base["ops_per_sec"] - 1
+        marker = ""
+        if change < -threshold:
+            regressions.append(result["name"])
+            marker = "  <-- regresión"
+        print(f"{result['name']:<40} {base['ops_per_sec']:>14,.0f} {result['ops_per_sec']:>14,.0f} {change:>+8.1%}{marker}")
+    return regressions
+
+def print_results(results: List[dict]):
+    """Imprime la tabla de resultados."""
+    print(f"{'caso':<40} {'ops/s':>14} {'pico B/op':>11} {'retenido B/op':>14}")
+    for result in results:
+        print(
+            f"{result['name']:<40} {result['ops_per_sec']:>14,.0f} "
+            f"{result['alloc_peak_bytes_per_op']:>11,.0f} {result['retained_bytes_per_op']:>14,.1f}"
+        )
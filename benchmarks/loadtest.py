@@ -0,0 +1,276 @@
+"""
+Prueba de carga de la aplicación completa con una mezcla configurable de escenarios.
+
+Siembra N cuentas sintéticas y luego ejecuta creación, listado, movimientos de
+saldo (amount) y actualizaciones de campos con una concurrencia fija, reportando
+RPS, percentiles de latencia y tasa de errores por endpoint.
+
+Uso:
+    # En proceso (ASGI, sin red), con el backend en memoria
+    python -m benchmarks.loadtest --set ACCOUNT_BACKEND=memory
+
+    # Contra un servidor local ya levantado
+    python -m benchmarks.loadtest --url http://localhost:8000 --concurrency 64 --duration 30
+
+    # Comparar configuraciones
+    python -m benchmarks.loadtest --set MONGODB_MAX_POOL_SIZE=16 --output a.json
+    python -m benchmarks.loadtest --set MONGODB_MAX_POOL_SIZE=64 --output b.json --compare a.json
+
+Con MongoDB las cuentas sintéticas (LT-*) quedan en la colección 'acount': use una base
+de datos desechable o --cleanup para eliminarlas al terminar.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional
+
+import httpx
+from bson import ObjectId
+
+from benchmarks.synthetic import AccountGenerator
+
+DEFAULT_MIX = "create=10,list=5,amount=60,patch=25"
+SCENARIOS = ("create", "list", "amount", "patch")
+
+def parse_mix(value: str) -> Dict[str, float]:
+    """Convierte 'create=10,list=5,...' en pesos por escenario."""
+    mix = {}
+    for item in value.split(","):
+        name, _, weight = item.partition("=")
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise argparse.ArgumentTypeError(f"Escenario desconocido: {name} (opciones: {', '.join(SCENARIOS)})")
+        mix[name] = float(weight)
+    if not any(mix.values()):
+        raise argparse.ArgumentTypeError("La mezcla debe tener al menos un peso mayor que cero")
+    return mix
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Percentil por rango más cercano sobre una lista ordenada."""
+    if not sorted_values:
+        return 0.0
+    # round() descarta el error binario del producto (0.07 * 100 = 7.000000000000001)
+    rank = math.ceil(round(fraction * len(sorted_values), 9))
+    index = max(0, min(len(sorted_values) - 1, rank - 1))
+    return sorted_values[index]
+
+class Recorder:
+    """Acumula latencias y códigos de estado por escenario."""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    def record(self, scenario: str, latency: float, status: str):
+        self.latencies[scenario].append(latency)
+        self.statuses[scenario][status] += 1
+
+    def report(self, elapsed: float) -> dict:
+        endpoints = {}
+        total = 0
+        total_errors = 0
+        for scenario, values in self.latencies.items():
+            values.sort()
+            statuses = dict(self.statuses[scenario])
+            errors = sum(count for status, count in statuses.items() if not status.startswith("2"))
+            total += len(values)
+            total_errors += errors
+            endpoints[scenario] = {
+                "requests": len(values),
+                "rps": len(values) / elapsed,
+                "p50_ms": percentile(values, 0.50) * 1000,
+                "p95_ms": percentile(values, 0.95) * 1000,
+                "p99_ms": percentile(values, 0.99) * 1000,
+                "max_ms": values[-1] * 1000,
+                "error_rate": errors / len(values),
+                "statuses": statuses,
+            }
+        return {
+            "elapsed_s": elapsed,
+            "requests": total,
+            "rps": total / elapsed if elapsed else 0.0,
+            "error_rate": total_errors / total if total else 0.0,
+            "endpoints": endpoints,
+        }
+
+@asynccontextmanager
+async def open_client(url: Optional[str], concurrency: int):
+    """Cliente HTTP contra un servidor local o la aplicación en proceso (con su lifespan)."""
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    if url:
+        async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30.0) as client:
+            yield client
+        return
+    # Importación diferida: las variables de --set deben aplicarse antes de cargar la configuración
+    from app.main import app
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=30.0) as client:
+            yield client
+
+async def timed(client: httpx.AsyncClient, recorder: Recorder, scenario: str, method: str, path: str, **kwargs):
+    """Ejecuta una solicitud registrando latencia y estado."""
+    start = time.perf_counter()
+    try:
+        response = await client.request(method, path, **kwargs)
+        status = str(response.status_code)
+    except httpx.HTTPError as exc:
+        response = None
+        status = type(exc).__name__
+    recorder.record(scenario, time.perf_counter() - start, status)
+    return response
+
+async def seed(client: httpx.AsyncClient, generator: AccountGenerator, count: int, concurrency: int) -> List[str]:
+    """Crea las cuentas iniciales y devuelve sus IDs."""
+    ids: List[str] = []
+    semaphore = asyncio.Semaphore(concurrency)
+    recorder = Recorder()
+
+    async def create_one(payload):
+        async with semaphore:
+            response = await timed(client, recorder, "seed", "POST", "/accounts", json=payload)
+            if response is not None and response.status_code == 201:
+                ids.append(response.json()["id"])
+
+    await asyncio.gather(*(create_one(payload) for payload in generator.many(count)))
+    return ids
+
+async def drive(client, generator: AccountGenerator, ids: List[str], mix: Dict[str, float],
+                concurrency: int, duration: float, max_requests: Optional[int], seed_value: int) -> dict:
+    """Ejecuta la mezcla de escenarios con 'concurrency' trabajadores en bucle cerrado."""
+    recorder = Recorder()
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    deadline = time.perf_counter() + duration
+    issued = 0
+
+    async def worker(worker_id: int):
+        nonlocal issued
+        rnd = random.Random(seed_value + worker_id)
+        while time.perf_counter() < deadline and (max_requests is None or issued < max_requests):
+            issued += 1
+            scenario = rnd.choices(names, weights)[0]
+            if scenario == "create":
+                response = await timed(client, recorder, "create", "POST", "/accounts", json=generator.validated())
+                if response is not None and response.status_code == 201:
+                    ids.append(response.json()["id"])
+            elif scenario == "list":
+                await timed(client, recorder, "list", "GET", "/accounts")
+            elif scenario == "amount":
+                await timed(client, recorder, "amount", "PATCH", f"/accounts/{rnd.choice(ids)}", json=generator.amount_update())
+            else:
+                await timed(client, recorder, "patch", "PATCH", f"/accounts/{rnd.choice(ids)}", json=generator.field_update())
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    return recorder.report(time.perf_counter() - start)
+
+def print_report(report: dict):
+    """Imprime el resumen por endpoint."""
+    print(f"\nTotal: {report['requests']} solicitudes en {report['elapsed_s']:.1f}s -> "
+          f"{report['rps']:,.0f} RPS, errores {report['error_rate']:.2%}")
+    print(f"{'endpoint':<10} {'req':>8} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9} {'errores':>8}")
+    for name, data in sorted(report["endpoints"].items()):
+        print(f"{name:<10} {data['requests']:>8} {data['rps']:>9,.0f} {data['p50_ms']:>9.2f} {data['p95_ms']:>9.2f} "
+              f"{data['p99_ms']:>9.2f} {data['max_ms']:>9.2f} {data['error_rate']:>8.2%}")
+
+def print_comparison(report: dict, baseline: dict):
+    """Compara RPS y p99 por endpoint con otra ejecución."""
+    print(f"\nComparación con {baseline.get('label') or 'línea base'}:")
+    print(f"{'endpoint':<10} {'rps base':>10} {'rps':>10} {'p99 base':>10} {'p99':>10}")
+    for name, data in sorted(report["endpoints"].items()):
+        base = baseline["report"]["endpoints"].get(name)
+        if base:
+            print(f"{name:<10} {base['rps']:>10,.0f} {data['rps']:>10,.0f} {base['p99_ms']:>10.2f} {data['p99_ms']:>10.2f}")
+    print(f"{'total':<10} {baseline['report']['rps']:>10,.0f} {report['rps']:>10,.0f}")
+
+async def cleanup(ids: List[str]) -> int:
+    """
+    Elimina de MongoDB las cuentas creadas por la prueba (sembradas y del escenario create).
+    Usa MONGODB_URI y DATABASE_NAME del entorno local, que deben apuntar a la base del servidor.
+    """
+    from motor.motor_asyncio import AsyncIOMotorClient
+    from app.core.config import settings
+    client = AsyncIOMotorClient(settings.MONGODB_URI)
+    try:
+        collection = client[settings.DATABASE_NAME].acount
+        deleted = 0
+        for start in range(0, len(ids), 1000):
+            batch = [ObjectId(account_id) for account_id in ids[start:start + 1000]]
+            deleted += (await collection.delete_many({"_id": {"$in": batch}})).deleted_count
+        return deleted
+    finally:
+        client.close()
+
+async def main(args) -> int:
+    generator = AccountGenerator(seed=args.seed)
+    ids: List[str] = []
+    try:
+        async with open_client(args.url, args.concurrency) as client:
+            print(f"Sembrando {args.accounts} cuentas...", file=sys.stderr)
+            ids.extend(await seed(client, generator, args.accounts, args.concurrency))
+            if not ids:
+                print("No se pudo crear ninguna cuenta; verifique el servidor y la configuración.", file=sys.stderr)
+                return 1
+            print(f"Ejecutando mezcla {args.mix} con concurrencia {args.concurrency}...", file=sys.stderr)
+            report = await drive(client, generator, ids, args.mix, args.concurrency,
+                                 args.duration, args.requests, args.seed)
+    finally:
+        from app.core.config import settings # Diferida: --set ya está aplicado
+        if args.cleanup and ids and (args.url or settings.ACCOUNT_BACKEND != "memory"):
+            deleted = await cleanup(ids)
+            print(f"Cuentas sintéticas eliminadas: {deleted} de {len(ids)}", file=sys.stderr)
+
+    print_report(report)
+    result = {
+        "label": args.label,
+        "target": args.url or "in-process",
+        "settings": args.set,
+        "accounts": args.accounts,
+        "concurrency": args.concurrency,
+        "mix": args.mix,
+        "report": report,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(result, handle, indent=2)
+        print(f"\nResultados guardados en {args.output}")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as handle:
+            print_comparison(report, json.load(handle))
+    return 0
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Prueba de carga de la API bancaria")
+    parser.add_argument("--url", help="URL de un servidor local; si se omite, la app se ejecuta en proceso")
+    parser.add_argument("--accounts", type=int, default=1000, help="Cuentas sintéticas a sembrar")
+    parser.add_argument("--concurrency", type=int, default=32, help="Solicitudes simultáneas")
+    parser.add_argument("--duration", type=float, default=10.0, help="Duración de la carga en segundos")
+    parser.add_argument("--requests", type=int, help="Máximo de solicitudes (además de la duración)")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX), help=f"Pesos por escenario (por defecto {DEFAULT_MIX})")
+    parser.add_argument("--seed", type=int, default=42, help="Semilla de los datos y la mezcla")
+    parser.add_argument("--set", action="append", default=[], metavar="CLAVE=VALOR",
+                        help="Sobrescribe una variable de Settings en modo en proceso (repetible)")
+    parser.add_argument("--label", help="Nombre de la ejecución para las comparaciones")
+    parser.add_argument("--output", help="Ruta del JSON con los resultados")
+    parser.add_argument("--compare", help="JSON de otra ejecución con el que comparar")
+    parser.add_argument("--cleanup", action="store_true",
+                        help="Elimina de MongoDB las cuentas creadas al terminar (usa MONGODB_URI/DATABASE_NAME locales)")
+    args = parser.parse_args(argv)
+    if args.set and args.url:
+        parser.error("--set solo aplica en modo en proceso; configure el servidor remoto con sus variables de entorno")
+    return args
+
+if __name__ == "__main__":
+    arguments = parse_args()
+    for assignment in arguments.set:
+        key, _, value = assignment.partition("=")
+        os.environ[key] = value
+    sys.exit(asyncio.run(main(arguments)))
@@ -0,0 +1,186 @@
+"""
+Micro-benchmarks de las rutas críticas: validación de esquemas, conversiones
+documento -> Account -> AccountResponse, serialización y métodos de AccountCRUD.
+
+Uso:
+    python -m benchmarks.run                                  # backend en memoria
+    python -m benchmarks.run --backend mongo                  # MongoDB local (MONGODB_URI)
+    python -m benchmarks.run --save benchmarks/results/base.json
+    python -m benchmarks.run --compare benchmarks/results/base.json --fail-on-regression
+    python -m benchmarks.run --filter validation
+"""
+import argparse
+import asyncio
+import sys
+from typing import Callable, Dict
+
+from bson import ObjectId
+from pydantic import ValidationError
+
+from app.core.database import db
+from app.crud.account import AccountCRUD
+from app.crud.repository import InMemoryAccountRepository, MongoAccountRepository
+from app.models.account import Account
+from app.schemas.account import AccountCreate, AccountResponse, AccountUpdate
+from benchmarks.harness import compare, load_results, print_results, run_case, save_results
+
+CREATE_PAYLOAD = {
+    "account_number": "ACC-001",
+    "account_type": "savings",
+    "customer_name": "Juan Pérez García",
+    "document_type": "CC",
+    "document_number": " 12345678 ",
+    "phone": "+57 300 123 4567",
+    "email": "Juan.Perez@Email.com ",
+    "address": "Calle 123 #45-67, Bogotá",
+    "balance": 1000.50
+}
+UPDATE_PAYLOAD = {"customer_name": "Juan Carlos Pérez García", "email": "juan.carlos@email.com", "amount": 250.0}
+INVALID_UPDATE_PAYLOAD = {"customer_name": "A", "phone": "123"}
+LIST_SIZE = 100 # Cuentas sembradas para el caso get_all_accounts
+
+def validation_cases() -> Dict[str, Callable]:
+    """Validación de AccountCreate/AccountUpdate (restricciones declarativas y model_validator de AccountUpdate)."""
+    create_json = AccountCreate(**CREATE_PAYLOAD).model_dump_json().encode()
+
+    def update_invalid():
+        try:
+            AccountUpdate.model_validate(INVALID_UPDATE_PAYLOAD)
+        except ValidationError:
+            pass
+
+    def update_empty():
+        try:
+            AccountUpdate.model_validate({})
+        except ValidationError:
+            pass
+
+    return {
+        "validation.account_create": lambda: AccountCreate.model_validate(CREATE_PAYLOAD),
+        "validation.account_create_json": lambda: AccountCreate.model_validate_json(create_json),
+        "validation.account_update": lambda: AccountUpdate.model_validate(UPDATE_PAYLOAD),
+        "validation.account_update_invalid": update_invalid,
+        "validation.account_update_empty": update_empty,
+    }
+
+def conversion_cases() -> Dict[str, Callable]:
+    """Conversiones documento -> Account -> AccountResponse y serialización JSON."""
+    document = AccountCreate(**CREATE_PAYLOAD).model_dump()
+    document["_id"] = ObjectId()
+    account = Account(**{**document, "_id": str(document["_id"])})
+    response = AccountResponse(**account.model_dump())
+
+    def document_to_account():
+        # Igual que el repositorio: copia del documento con _id como string
+        stored = dict(document)
+        stored["_id"] = str(stored["_id"])
+        return Account(**stored)
+
+    def account_to_response():
+        # Igual que los endpoints: construcción campo a campo
+        return AccountResponse(
+            id=account.id,
+            account_number=account.account_number,
+            account_type=account.account_type,
+            customer_name=account.customer_name,
+            document_type=account.document_type,
+            document_number=account.document_number,
+            phone=account.phone,
+            email=account.email,
+            address=account.address,
+            balance=account.balance
+        )
+
+    return {
+        "conversion.document_to_account": document_to_account,
+        "conversion.account_to_response": account_to_response,
+        "serialization.response_json": response.model_dump_json,
+        "serialization.response_dict": lambda: response.model_dump(mode="json"),
+    }
+
+async def crud_cases(backend: str) -> Dict[str, Callable]:
+    """Métodos de AccountCRUD contra el backend elegido, con datos sembrados."""
+    if backend == "mongo":
+        await db.connect()
+        repository = MongoAccountRepository(db.database)
+    else:
+        repository = InMemoryAccountRepository()
+    await repository.delete_all()
+    crud = AccountCRUD(repository)
+    account_create = AccountCreate(**CREATE_PAYLOAD)
+    accounts = [await crud.create_account(account_create) for _ in range(LIST_SIZE)]
+    target = accounts[0].id
+    created = []
+
+    async def create_account():
+        # Mantiene el tamaño de la colección acotado durante la medición
+        created.append((await crud.create_account(account_create)).id)
+        if len(created) >= 10000:
+            await repository.delete_all()
+            created.clear()
+            for _ in range(LIST_SIZE):
+                await crud.create_account(account_create)
+
+    async def get_account_by_id():
+        await crud.get_account_by_id(target)
+
+    async def update_account_balance():
+        await crud.update_account_balance(target, 1.0)
+
+    async def update_account():
+        await crud.update_account(target, {"phone": "555-0000", "amount": 1.0})
+
+    return {
+        "crud.get_account_by_id": get_account_by_id,
+        "crud.update_account_balance": update_account_balance,
+        "crud.update_account": update_account,
+        f"crud.get_all_accounts[{LIST_SIZE}]": crud.get_all_accounts,
+        # Al final para no alterar el tamaño del listado anterior
+        "crud.create_account": create_account,
+    }
+
+async def main(args) -> int:
+    cases: Dict[str, Callable] = {}
+    cases.update(validation_cases())
+    cases.update(conversion_cases())
+    if not args.skip_crud:
+        cases.update(await crud_cases(args.backend))
+    if args.filter:
+        cases = {name: case for name, case in cases.items() if args.filter in name}
+
+    results = []
+    try:
+        for name, case in cases.items():
+            results.append(await run_case(name, case, args.min_time, args.repeat, args.alloc_samples))
+            print(f"  {name}: {results[-1]['ops_per_sec']:,.0f} ops/s", file=sys.stderr)
+    finally:
+        if args.backend == "mongo" and not args.skip_crud:
+            await db.database.acount.delete_many({})
+            await db.close()
+
+    print_results(results)
+    if args.save:
+        save_results(args.save, results, {"backend": args.backend, "min_time": args.min_time, "repeat": args.repeat})
+        print(f"\nResultados guardados en {args.save}")
+    if args.compare:
+        regressions = compare(results, load_results(args.compare), args.threshold)
+        if regressions and args.fail_on_regression:
+            return 1
+    return 0
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Micro-benchmarks de la API bancaria")
+    parser.add_argument("--backend", choices=["memory", "mongo"], default="memory", help="Backend para los casos de CRUD")
+    parser.add_argument("--skip-crud", action="store_true", help="Omite los casos de AccountCRUD")
+    parser.add_argument("--filter", help="Solo ejecuta los casos cuyo nombre contiene este texto")
+    parser.add_argument("--min-time", type=float, default=0.5, help="Segundos mínimos por medición")
+    parser.add_argument("--repeat", type=int, default=3, help="Mediciones por caso (se reporta la mejor)")
+    parser.add_argument("--alloc-samples", type=int, default=200, help="Operaciones trazadas para medir memoria")
+    parser.add_argument("--save", help="Ruta del JSON donde guardar la línea base")
+    parser.add_argument("--compare", help="Línea base JSON contra la que comparar")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Caída de ops/s considerada regresión (0.10 = 10%%)")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Termina con código 1 si hay regresiones")
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(parse_args())))
@@ -0,0 +1,63 @@
+import random
+from typing import Iterator, List
+
+from app.schemas.account import AccountCreate, DocumentType
+
+FIRST_NAMES = ["Juan", "María", "Carlos", "Ana", "Luis", "Laura", "Andrés", "Camila", "Jorge", "Valentina", "Pedro", "Sofía"]
+LAST_NAMES = ["Pérez", "González", "Rodríguez", "López", "Martínez", "Gómez", "Díaz", "Torres", "Ramírez", "Vargas"]
+CITIES = ["Bogotá", "Medellín", "Cali", "Barranquilla", "Cartagena", "Bucaramanga", "Pereira"]
+ACCOUNT_TYPES = ["savings", "checking"]
+
+class AccountGenerator:
+    """Genera cuentas sintéticas reproducibles que pasan la validación de AccountCreate."""
+
+    def __init__(self, seed: int = 42, prefix: str = "LT"):
+        self.random = random.Random(seed)
+        self.prefix = prefix
+        self.sequence = 0
+
+    def payload(self) -> dict:
+        """Devuelve el cuerpo JSON de una nueva cuenta."""
+        self.sequence += 1
+        rnd = self.random
+        first, last = rnd.choice(FIRST_NAMES), rnd.choice(LAST_NAMES)
+        return {
+            "account_number": f"{self.prefix}-{self.sequence:08d}",
+            "account_type": rnd.choice(ACCOUNT_TYPES),
+            "customer_name": f"{first} {last} {rnd.choice(LAST_NAMES)}",
+            "document_type": rnd.choice(list(DocumentType)).value,
+            "document_number": str(rnd.randint(10_000_000, 9_999_999_999)),
+            "phone": f"+57 3{rnd.randint(0, 29):02d} {rnd.randint(100, 999)} {rnd.randint(1000, 9999)}",
+            "email": f"{first}.{last}{self.sequence}@example.com".lower(),
+            "address": f"Calle {rnd.randint(1, 200)} #{rnd.randint(1, 99)}-{rnd.randint(1, 99)}, {rnd.choice(CITIES)}",
+            "balance": round(rnd.uniform(1_000, 10_000), 2) # Margen para los retiros del escenario
+        }
+
+    def validated(self) -> dict:
+        """Devuelve una cuenta ya validada por AccountCreate (como diccionario JSON)."""
+        return AccountCreate(**self.payload()).model_dump(mode="json")
+
+    def field_update(self) -> dict:
+        """Actualización parcial de datos del titular (sin cambio de saldo)."""
+        rnd = self.random
+        options = [
+            lambda: {"customer_name": f"{rnd.choice(FIRST_NAMES)} {rnd.choice(LAST_NAMES)}"},
+            lambda: {"phone": f"+57 3{rnd.randint(0, 29):02d} {rnd.randint(100, 999)} {rnd.randint(1000, 9999)}"},
+            lambda: {"address": f"Carrera {rnd.randint(1, 200)} #{rnd.randint(1, 99)}-{rnd.randint(1, 99)}, {rnd.choice(CITIES)}"},
+        ]
+        return rnd.choice(options)()
+
+    def amount_update(self) -> dict:
+        """Movimiento de saldo; los retiros son pequeños para no dejar saldos negativos."""
+        rnd = self.random
+        amount = round(rnd.uniform(1, 500), 2) if rnd.random() < 0.6 else -round(rnd.uniform(1, 50), 2)
+        return {"amount": amount}
+
+    def many(self, count: int) -> Iterator[dict]:
+        """Genera 'count' cuentas validadas."""
+        for _ in range(count):
+            yield self.validated()
+
+def generate_accounts(count: int, seed: int = 42) -> List[dict]:
+    """Atajo para obtener una lista de cuentas sintéticas."""
+    return list(AccountGenerator(seed).many(count))
@@ -0,0 +1,37 @@
+import pytest
+import pytest_asyncio
+from pymongo import MongoClient
+from pymongo.errors import PyMongoError
+from app.core.config import settings
+from app.core.database import db
+from app.crud.repository import MongoAccountRepository, memory_account_repository
+
+# Fixture que indica si hay un servidor MongoDB accesible (se consulta una vez por sesión)
+@pytest.fixture(scope="session")
+def mongo_available() -> bool:
+    client = MongoClient(settings.MONGODB_URI, serverSelectionTimeoutMS=500)
+    try:
+        client.admin.command("ping")
+        return True
+    except PyMongoError:
+        return False
+    finally:
+        client.close()
+
+# Fixture que ejecuta cada prueba contra ambos backends y limpia las cuentas antes y después
+@pytest_asyncio.fixture(params=["memory", "mongo"])
+async def repository(request, monkeypatch, mongo_available):
+    backend = request.param
+    if backend == "mongo" and not mongo_available:
+        pytest.skip("MongoDB no está disponible")
+    monkeypatch.setattr(settings, "ACCOUNT_BACKEND", backend)
+    if backend == "mongo":
+        await db.connect() # Asegura que la conexión esté abierta
+        repo = MongoAccountRepository(db.database)
+    else:
+        repo = memory_account_repository
+    await repo.delete_all() # Limpia la colección de cuentas
+    yield repo
+    await repo.delete_all() # Limpia de nuevo después de la prueba
+    if backend == "mongo":
+        await db.close() # Cierra la conexión
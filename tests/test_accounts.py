@@ -1,18 +1,15 @@
+import json
+import uuid
 import pytest
 import pytest_asyncio
 from httpx import AsyncClient, ASGITransport
 from app.main import app # Importa la instancia de la aplicación FastAPI
-from app.core.database import db # Para limpiar la base de datos de pruebas
+from app.core.config import settings
+from app.services.idempotency_service import idempotency_cache
 from bson import ObjectId
 
-# Fixture para limpiar la base de datos antes de cada prueba
-@pytest_asyncio.fixture(autouse=True)
-async def clear_db():
-    await db.connect() # Asegura que la conexión esté abierta
-    await db.database.acount.delete_many({}) # Limpia la colección de cuentas
-    yield
-    await db.database.acount.delete_many({}) # Limpia de nuevo después de la prueba
-    await db.close() # Cierra la conexión
+# Cada prueba se ejecuta contra ambos backends (fixture 'repository' de conftest)
+pytestmark = pytest.mark.usefixtures("repository")
 
 # Fixture para el cliente de prueba HTTP
 @pytest_asyncio.fixture
@@ -22,7 +19,7 @@ async def async_client():
 
 # Prueba para crear una cuenta bancaria
 @pytest.mark.asyncio
-async def test_create_account(async_client: AsyncClient):
+async def test_create_account(async_client: AsyncClient, repository):
     response = await async_client.post(
         "/accounts",
         json={
@@ -44,7 +41,7 @@ async def test_create_account(async_client: AsyncClient):
     assert data["account_number"] == "123-456-789"
     assert data["balance"] == 500.0
     # Verifica que la cuenta existe en la base de datos
-    account_in_db = await db.database.acount.find_one({"_id": ObjectId(data["id"])})
+    account_in_db = await repository.find_by_id(data["id"])
     assert account_in_db is not None
     assert account_in_db["customer_name"] == "Alice Smith"
 
@@ -285,4 +282,102 @@ async def test_update_account_invalid_name(async_client: AsyncClient):
     assert update_response.status_code == 422
     data = update_response.json()
     error_messages = [err["msg"] for err in data["detail"]]
-    assert any("al menos 3 caracteres" in msg for msg in error_messages)
\ No newline at end of file
+    assert any("al menos 3 caracteres" in msg for msg in error_messages)
+
+# Prueba que las restricciones declarativas devuelven mensajes en español
+@pytest.mark.asyncio
+async def test_create_account_spanish_messages(async_client: AsyncClient):
+    response = await async_client.post(
+        "/accounts",
+        json={
+            "account_number": "999-888-777",
+            "account_type": "savings",
+            "customer_name": "Eva Ríos",
+            "document_type": "CC",
+            "document_number": "88888888",
+            "phone": "555-8888",
+            "email": "correo-invalido",
+            "address": "Corta",
+            "balance": -10.0
+        }
+    )
+    assert response.status_code == 422
+    messages = {err["loc"][-1]: err["msg"] for err in response.json()["detail"]}
+    assert messages["email"] == "El email debe tener un formato válido"
+    assert messages["address"] == "La dirección debe tener al menos 10 caracteres"
+    assert messages["balance"] == "El saldo no puede ser negativo"
+
+# Datos de una cuenta para las pruebas de idempotencia
+IDEMPOTENT_ACCOUNT = {
+    "account_number": "777-666-555",
+    "account_type": "checking",
+    "customer_name": "Mario Vargas",
+    "document_type": "CC",
+    "document_number": "77777777",
+    "phone": "555-7777",
+    "email": "mario@example.com",
+    "address": "777 Seventh Avenue",
+    "balance": 100.0
+}
+
+# Fixture que genera una clave de idempotencia nueva en cada prueba
+@pytest.fixture
+def idempotency_key():
+    idempotency_cache.clear()
+    return f"test-{uuid.uuid4()}"
+
+# Prueba que un POST repetido con la misma clave devuelve la respuesta original sin crear otra cuenta
+@pytest.mark.asyncio
+async def test_create_account_idempotent_replay(async_client: AsyncClient, repository, idempotency_key):
+    headers = {"Idempotency-Key": idempotency_key}
+    first = await async_client.post("/accounts", json=IDEMPOTENT_ACCOUNT, headers=headers)
+    second = await async_client.post("/accounts", json=IDEMPOTENT_ACCOUNT, headers=headers)
+    assert first.status_code == 201
+    assert "Idempotent-Replayed" not in first.headers
+    assert second.status_code == 201
+    assert second.headers["Idempotent-Replayed"] == "true"
+    assert second.json() == first.json()
+    assert len(await repository.find_all()) == 1
+
+# Prueba que un movimiento de saldo repetido con la misma clave se aplica una sola vez
+@pytest.mark.asyncio
+async def test_update_amount_idempotent(async_client: AsyncClient, idempotency_key):
+    account_id = (await async_client.post("/accounts", json=IDEMPOTENT_ACCOUNT)).json()["id"]
+    headers = {"Idempotency-Key": idempotency_key}
+    for _ in range(3):
+        response = await async_client.patch(f"/accounts/{account_id}", json={"amount": 25.0}, headers=headers)
+        assert response.status_code == 200
+        assert response.json()["balance"] == 125.0
+    assert (await async_client.get("/accounts")).json()[0]["balance"] == 125.0
+
+# Prueba que reutilizar la clave con otro cuerpo se rechaza y que una clave vacía no es válida
+@pytest.mark.asyncio
+async def test_idempotency_key_reused_or_empty(async_client: AsyncClient, idempotency_key):
+    account_id = (await async_client.post("/accounts", json=IDEMPOTENT_ACCOUNT)).json()["id"]
+    headers = {"Idempotency-Key": idempotency_key}
+    assert (await async_client.patch(f"/accounts/{account_id}", json={"amount": 10.0}, headers=headers)).status_code == 200
+    reused = await async_client.patch(f"/accounts/{account_id}", json={"amount": 20.0}, headers=headers)
+    assert reused.status_code == 422
+    assert reused.json()["detail"] == "La clave de idempotencia ya fue usada con una solicitud diferente"
+
+    empty = await async_client.post("/accounts", json=IDEMPOTENT_ACCOUNT, headers={"Idempotency-Key": ""})
+    assert empty.status_code == 422
+
+# Prueba que los montos no finitos o fuera de rango se rechazan con 422 (y no 500 en minor_units)
+@pytest.mark.asyncio
+async def test_non_finite_and_out_of_range_amounts(async_client: AsyncClient, monkeypatch):
+    monkeypatch.setattr(settings, "BALANCE_STORAGE", "minor_units")
+    headers = {"Content-Type": "application/json"}
+    template = json.dumps({**IDEMPOTENT_ACCOUNT, "balance": "BALANCE"})
+    for balance in ("Infinity", "NaN", "1e400", "1e14"):
+        body = template.replace('"BALANCE"', balance) # JSON no estándar que json.loads acepta
+        response = await async_client.post("/accounts", content=body, headers=headers)
+        assert response.status_code == 422, balance
+
+    account_id = (await async_client.post("/accounts", json=IDEMPOTENT_ACCOUNT)).json()["id"]
+    for amount in ("Infinity", "-Infinity", "NaN", "1e14", "-1e14"):
+        response = await async_client.patch(f"/accounts/{account_id}", content=f'{{"amount": {amount}}}', headers=headers)
+        assert response.status_code == 422, amount
+    messages = [err["msg"] for err in response.json()["detail"]]
+    assert messages == ["El monto no puede ser menor que -10,000,000,000,000"]
+    assert (await async_client.patch(f"/accounts/{account_id}", json={"amount": -50.0})).json()["balance"] == 50.0
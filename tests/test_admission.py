@@ -0,0 +1,140 @@
+import asyncio
+import pytest
+from fastapi import Depends, FastAPI
+from httpx import AsyncClient, ASGITransport
+from app.core.admission import (
+    AdmissionController, AdmissionRejected, ConcurrencyLimiter, Priority, admission, shared_max_concurrent
+)
+from app.core.config import settings
+from app.crud.repository import memory_account_repository
+from app.main import app
+
+ACCOUNT_DATA = {
+    "account_number": "ADM-001",
+    "account_type": "savings",
+    "customer_name": "Pedro Castillo",
+    "document_type": "CC",
+    "document_number": "66666666",
+    "phone": "555-6666",
+    "email": "pedro@example.com",
+    "address": "666 Sixth Boulevard",
+    "balance": 100.0
+}
+
+# Prueba que se rechaza de inmediato cuando la cola está llena
+@pytest.mark.asyncio
+async def test_limiter_sheds_when_queue_full():
+    limiter = ConcurrencyLimiter("test", max_concurrent=1, max_queue=1)
+    await limiter.acquire(Priority.HIGH, timeout=1.0)
+    waiter = asyncio.create_task(limiter.acquire(Priority.HIGH, timeout=1.0))
+    await asyncio.sleep(0)
+    with pytest.raises(AdmissionRejected) as exc_info:
+        await limiter.acquire(Priority.HIGH, timeout=1.0)
+    assert exc_info.value.reason == "queue_full"
+    limiter.release()
+    await waiter
+    limiter.release()
+    stats = limiter.stats()
+    assert stats["active"] == 0
+    assert stats["queued"] == 0
+    assert stats["admitted"] == 2
+    assert stats["rejected_queue_full"] == 1
+
+# Prueba que la espera en cola respeta el tiempo máximo
+@pytest.mark.asyncio
+async def test_limiter_times_out_waiting():
+    limiter = ConcurrencyLimiter("test", max_concurrent=1, max_queue=5)
+    await limiter.acquire(Priority.HIGH, timeout=1.0)
+    with pytest.raises(AdmissionRejected) as exc_info:
+        await limiter.acquire(Priority.LOW, timeout=0.01)
+    assert exc_info.value.reason == "timeout"
+    assert limiter.stats()["queued"] == 0
+    limiter.release()
+    assert limiter.stats()["active"] == 0
+
+# Prueba que las solicitudes prioritarias se atienden antes que los listados
+@pytest.mark.asyncio
+async def test_limiter_serves_high_priority_first():
+    limiter = ConcurrencyLimiter("test", max_concurrent=1, max_queue=5)
+    await limiter.acquire(Priority.HIGH, timeout=1.0)
+    order = []
+
+    async def worker(name, priority):
+        await limiter.acquire(priority, timeout=1.0)
+        order.append(name)
+        limiter.release()
+
+    low = asyncio.create_task(worker("list", Priority.LOW))
+    await asyncio.sleep(0)
+    high = asyncio.create_task(worker("read", Priority.HIGH))
+    await asyncio.sleep(0)
+    limiter.release()
+    await asyncio.gather(low, high)
+    assert order == ["read", "list"]
+
+# Prueba que una ruta saturada responde 503 con Retry-After
+@pytest.mark.asyncio
+async def test_route_returns_503_with_retry_after():
+    controller = AdmissionController(max_concurrent=10, max_queue=0, queue_timeout=0.05, retry_after=3)
+    release = asyncio.Event()
+    test_app = FastAPI()
+
+    @test_app.get("/slow", dependencies=[Depends(controller.limit("slow", max_concurrent=1))])
+    async def slow():
+        await release.wait()
+        return {"ok": True}
+
+    async with AsyncClient(transport=ASGITransport(app=test_app), base_url="http://test") as client:
+        first = asyncio.create_task(client.get("/slow"))
+        await asyncio.sleep(0.05)
+        response = await client.get("/slow")
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "3"
+        release.set()
+        assert (await first).status_code == 200
+    assert controller.stats()["routes"]["slow"]["rejected_queue_full"] == 1
+
+# Prueba que el límite compartido por defecto es el pool de MongoDB del worker
+def test_shared_limit_defaults_to_pool_size(monkeypatch):
+    monkeypatch.setattr(settings, "ADMISSION_MAX_CONCURRENT", 0)
+    monkeypatch.setattr(settings, "MONGODB_MAX_POOL_SIZE", 25)
+    assert shared_max_concurrent() == 25
+    monkeypatch.setattr(settings, "ADMISSION_MAX_CONCURRENT", 10)
+    assert shared_max_concurrent() == 10
+
+# Prueba el control de admisión en las rutas reales: un PATCH saturado recibe 503 y el listado sigue disponible
+@pytest.mark.asyncio
+async def test_accounts_routes_shed_with_503(monkeypatch):
+    monkeypatch.setattr(settings, "ACCOUNT_BACKEND", "memory")
+    await memory_account_repository.delete_all()
+    limiter = admission.routes["update_account"]
+    monkeypatch.setattr(limiter, "max_concurrent", 1)
+    monkeypatch.setattr(limiter, "max_queue", 0)
+    entered = asyncio.Event()
+    release = asyncio.Event()
+    original_update = memory_account_repository.update
+
+    async def slow_update(*args, **kwargs):
+        entered.set()
+        await release.wait() # Simula una escritura lenta en la base de datos
+        return await original_update(*args, **kwargs)
+
+    monkeypatch.setattr(memory_account_repository, "update", slow_update)
+    rejected_before = limiter.rejected_queue_full
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        account_id = (await client.post("/accounts", json=ACCOUNT_DATA)).json()["id"]
+        first = asyncio.create_task(client.patch(f"/accounts/{account_id}", json={"amount": 10.0}))
+        await asyncio.wait_for(entered.wait(), timeout=1.0)
+
+        shed = await client.patch(f"/accounts/{account_id}", json={"amount": 10.0})
+        assert shed.status_code == 503
+        assert shed.headers["Retry-After"] == str(settings.ADMISSION_RETRY_AFTER)
+        assert (await client.get("/accounts")).status_code == 200 # Otra ruta, otro cupo
+
+        metrics = (await client.get("/metrics/admission")).json()
+        assert metrics["routes"]["update_account"]["active"] == 1
+        release.set()
+        assert (await first).json()["balance"] == 110.0
+    assert limiter.rejected_queue_full == rejected_before + 1
+    assert limiter.stats()["active"] == 0
+    await memory_account_repository.delete_all()
@@ -0,0 +1,54 @@
+import gc
+import warnings
+import pytest
+from app.crud.repository import InMemoryAccountRepository
+from benchmarks import run
+from benchmarks.harness import load_results, run_case, save_results
+from benchmarks.loadtest import percentile
+
+# Prueba que una lambda que devuelve una corrutina se mide esperando la corrutina
+@pytest.mark.asyncio
+async def test_run_case_awaits_coroutine_returned_by_lambda():
+    calls = []
+
+    async def operation():
+        calls.append(1)
+
+    result = await run_case("lambda", lambda: operation(), min_time=0.001, repeat=1, alloc_samples=5)
+    assert result["ops_per_sec"] > 0
+    assert len(calls) > 15 # sonda + calentamiento + medición + memoria
+
+# Prueba que ningún caso de CRUD deja corrutinas sin esperar y que todos tocan el repositorio
+@pytest.mark.asyncio
+async def test_crud_cases_run_their_coroutines(monkeypatch):
+    repository = InMemoryAccountRepository()
+    monkeypatch.setattr(run, "InMemoryAccountRepository", lambda: repository)
+    cases = await run.crud_cases("memory")
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        for name, case in cases.items():
+            await run_case(name, case, min_time=0.001, repeat=1, alloc_samples=5)
+        gc.collect()
+    assert not [w for w in caught if "was never awaited" in str(w.message)]
+
+    # Las actualizaciones de saldo se aplicaron de verdad
+    balances = [document["balance"] for document in await repository.find_all()]
+    assert max(balances) > run.CREATE_PAYLOAD["balance"]
+
+# Prueba que la línea base se guarda aunque el directorio de destino no exista
+def test_save_results_creates_directory(tmp_path):
+    path = tmp_path / "results" / "base.json"
+    save_results(str(path), [{"name": "caso", "ops_per_sec": 1.0}], {})
+    assert load_results(str(path))["caso"]["ops_per_sec"] == 1.0
+
+# Prueba el percentil por rango más cercano (ceil(p * n))
+def test_percentile_nearest_rank():
+    values = [float(value) for value in range(1, 101)]
+    assert percentile(values, 0.50) == 50.0
+    assert percentile(values, 0.95) == 95.0
+    assert percentile(values, 0.99) == 99.0
+    assert percentile(values, 0.07) == 7.0
+    assert percentile(values, 1.0) == 100.0
+    assert percentile([float(value) for value in range(1, 11)], 0.50) == 5.0
+    assert percentile([3.0], 0.99) == 3.0
+    assert percentile([], 0.95) == 0.0
@@ -0,0 +1,156 @@
+import asyncio
+import json
+import pytest
+from app.core.config import settings
+from app.core.events import EventHub, event_hub
+from app.crud.account import AccountCRUD
+from app.crud.repository import InMemoryAccountRepository
+from app.main import app
+from app.schemas.account import AccountCreate
+
+ACCOUNT_DATA = {
+    "account_number": "EVT-001",
+    "account_type": "savings",
+    "customer_name": "Sofía Herrera",
+    "document_type": "CC",
+    "document_number": "55555555",
+    "phone": "555-5555",
+    "email": "sofia@example.com",
+    "address": "555 Fifth Street",
+    "balance": 100.0
+}
+
+# Prueba que cada evento llega a todos los suscriptores interesados
+@pytest.mark.asyncio
+async def test_publish_fans_out_with_filter():
+    hub = EventHub(max_subscribers=10, queue_size=10, policy="coalesce")
+    everything = hub.subscribe()
+    only_a = hub.subscribe(["a"])
+    hub.publish("account.updated", "a", {"balance": 1.0})
+    hub.publish("account.updated", "b", {"balance": 2.0})
+
+    first = await everything.get(timeout=0.1)
+    second = await everything.get(timeout=0.1)
+    assert [first.account_id, second.account_id] == ["a", "b"]
+    assert json.loads(first.data) == {"balance": 1.0}
+    assert (await only_a.get(timeout=0.1)).account_id == "a"
+    assert await only_a.get(timeout=0.01) is None
+
+# Prueba que un consumidor lento recibe el último saldo de cada cuenta
+@pytest.mark.asyncio
+async def test_slow_consumer_coalesces_by_account():
+    hub = EventHub(max_subscribers=10, queue_size=2, policy="coalesce")
+    subscription = hub.subscribe()
+    hub.publish("account.updated", "a", {"balance": 1.0})
+    hub.publish("account.updated", "b", {"balance": 1.0})
+    hub.publish("account.updated", "a", {"balance": 5.0})
+
+    events = [await subscription.get(timeout=0.1), await subscription.get(timeout=0.1)]
+    assert [(e.account_id, json.loads(e.data)["balance"]) for e in events] == [("b", 1.0), ("a", 5.0)]
+    assert hub.stats()["coalesced"] == 1
+
+# Prueba que la política drop_oldest descarta los eventos más antiguos
+@pytest.mark.asyncio
+async def test_slow_consumer_drops_oldest():
+    hub = EventHub(max_subscribers=10, queue_size=2, policy="drop_oldest")
+    subscription = hub.subscribe()
+    for balance in (1.0, 2.0, 3.0):
+        hub.publish("account.updated", "a", {"balance": balance})
+
+    events = [await subscription.get(timeout=0.1), await subscription.get(timeout=0.1)]
+    assert [json.loads(e.data)["balance"] for e in events] == [2.0, 3.0]
+    assert hub.stats()["dropped"] == 1
+
+# Prueba que los descartes de un consumidor lento siguen contando después de que se desconecta
+@pytest.mark.asyncio
+async def test_drop_counters_survive_unsubscribe():
+    hub = EventHub(max_subscribers=10, queue_size=1, policy="coalesce")
+    slow = hub.subscribe()
+    for account_id in ("a", "b", "b"):
+        hub.publish("account.updated", account_id, {"balance": 1.0})
+    hub.unsubscribe(slow)
+    assert hub.stats() == {"subscribers": 0, "published": 3, "pending": 0, "dropped": 1, "coalesced": 1}
+
+# Prueba el límite de suscriptores y el cierre del hub
+@pytest.mark.asyncio
+async def test_subscriber_limit_and_close():
+    hub = EventHub(max_subscribers=1, queue_size=2, policy="coalesce")
+    subscription = hub.subscribe()
+    assert hub.subscribe() is None
+    hub.close()
+    assert subscription.closed
+    assert await subscription.get(timeout=1.0) is None
+    assert hub.stats()["subscribers"] == 0
+
+# Prueba que un account.created pendiente no se reemplaza por una actualización posterior
+@pytest.mark.asyncio
+async def test_coalesce_keeps_created_event():
+    hub = EventHub(max_subscribers=10, queue_size=2, policy="coalesce")
+    subscription = hub.subscribe()
+    hub.publish("account.created", "a", {"balance": 1.0})
+    hub.publish("account.updated", "a", {"balance": 2.0})
+    hub.publish("account.updated", "a", {"balance": 3.0})
+    events = [await subscription.get(timeout=0.1), await subscription.get(timeout=0.1)]
+    assert [(e.type, json.loads(e.data)["balance"]) for e in events] == [("account.created", 1.0), ("account.updated", 3.0)]
+    assert hub.stats()["coalesced"] == 1
+
+# Prueba que los métodos de AccountCRUD publican sus cambios en el hub del proceso
+@pytest.mark.asyncio
+async def test_crud_publishes_account_changes(monkeypatch):
+    monkeypatch.setattr(settings, "EVENTS_SOURCE", "local")
+    crud = AccountCRUD(InMemoryAccountRepository())
+    subscription = event_hub.subscribe()
+    try:
+        account = await crud.create_account(AccountCreate(**ACCOUNT_DATA))
+        await crud.update_account_balance(account.id, 50.0)
+        await crud.update_account(account.id, {"phone": "555-0000", "amount": -25.0})
+        events = [await subscription.get(timeout=0.1) for _ in range(3)]
+    finally:
+        event_hub.unsubscribe(subscription)
+
+    assert [event.type for event in events] == ["account.created", "account.updated", "account.updated"]
+    assert {event.account_id for event in events} == {account.id}
+    payloads = [json.loads(event.data) for event in events]
+    assert [payload["account"]["balance"] for payload in payloads] == [100.0, 150.0, 125.0]
+    assert [payload["changed"] for payload in payloads] == [[], ["balance"], ["phone", "balance"]]
+
+async def read_frame(messages: asyncio.Queue) -> str:
+    """Lee el siguiente fragmento del cuerpo de la respuesta ASGI."""
+    while True:
+        message = await asyncio.wait_for(messages.get(), timeout=1.0)
+        if message["type"] == "http.response.body" and message.get("body"):
+            return message["body"].decode()
+
+# Prueba el endpoint SSE: filtro por account_ids y formato de cada evento
+@pytest.mark.asyncio
+async def test_events_endpoint_filters_and_formats():
+    messages: asyncio.Queue = asyncio.Queue()
+    disconnected = asyncio.Event()
+
+    async def receive():
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": "/accounts/events", "raw_path": b"/accounts/events",
+        "query_string": b"account_ids=a,%20b", "root_path": "", "headers": [(b"host", b"test")],
+        "client": ("test", 1), "server": ("test", 80),
+    }
+    server = asyncio.create_task(app(scope, receive, messages.put))
+    try:
+        start = await asyncio.wait_for(messages.get(), timeout=1.0)
+        assert start["status"] == 200
+        assert (b"content-type", b"text/event-stream; charset=utf-8") in start["headers"]
+        assert await read_frame(messages) == "retry: 3000\n\n"
+
+        event_hub.publish("account.updated", "c", {"balance": 1.0}) # Fuera del filtro
+        first = event_hub.publish("account.updated", "b", {"balance": 2.0})
+        event_hub.publish("account.created", "a", {"balance": 3.0})
+        assert await read_frame(messages) == f'id: {first.id}\nevent: account.updated\ndata: {{"balance": 2.0}}\n\n'
+        assert await read_frame(messages) == f'id: {first.id + 1}\nevent: account.created\ndata: {{"balance": 3.0}}\n\n'
+        assert event_hub.stats()["subscribers"] == 1
+    finally:
+        disconnected.set()
+        await asyncio.wait_for(server, timeout=2.0)
+    assert event_hub.stats()["subscribers"] == 0 # La desconexión libera la suscripción
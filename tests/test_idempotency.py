@@ -0,0 +1,197 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+import pytest
+from fastapi import HTTPException
+from pydantic import BaseModel
+from app.core.config import settings
+from app.core.database import db
+from app.crud.idempotency import IdempotencyCRUD
+from app.services.idempotency_service import IdempotencyCache, IdempotencyService
+
+class Result(BaseModel):
+    value: int
+
+# Servicio con caché propia y sin colección persistente
+@pytest.fixture
+def service():
+    return IdempotencyService(None, IdempotencyCache(max_size=10, ttl_seconds=60))
+
+# Prueba que un reintento devuelve la respuesta guardada sin repetir la operación
+@pytest.mark.asyncio
+async def test_retry_replays_stored_response(service: IdempotencyService):
+    calls = []
+
+    async def operation():
+        calls.append(1)
+        return Result(value=len(calls))
+
+    first = await service.execute("POST:/accounts:k1", "fp", operation, status_code=201)
+    assert first == Result(value=1)
+    replay = await service.execute("POST:/accounts:k1", "fp", operation, status_code=201)
+    assert replay.status_code == 201
+    assert replay.headers["Idempotent-Replayed"] == "true"
+    assert replay.body == b'{"value":1}'
+    assert len(calls) == 1
+
+# Prueba que los duplicados concurrentes esperan a la solicitud original
+@pytest.mark.asyncio
+async def test_concurrent_duplicates_wait_for_original(service: IdempotencyService):
+    calls = []
+    release = asyncio.Event()
+
+    async def operation():
+        calls.append(1)
+        await release.wait()
+        return Result(value=7)
+
+    original = asyncio.create_task(service.execute("k2", "fp", operation))
+    await asyncio.sleep(0)
+    duplicate = asyncio.create_task(service.execute("k2", "fp", operation))
+    await asyncio.sleep(0)
+    release.set()
+    first, second = await asyncio.gather(original, duplicate)
+    assert first == Result(value=7)
+    assert second.body == b'{"value":7}'
+    assert len(calls) == 1
+
+# Prueba que reutilizar la clave con otra solicitud se rechaza
+@pytest.mark.asyncio
+async def test_key_reused_with_different_payload(service: IdempotencyService):
+    async def operation():
+        return Result(value=1)
+
+    await service.execute("k3", "fp-a", operation)
+    with pytest.raises(HTTPException) as exc_info:
+        await service.execute("k3", "fp-b", operation)
+    assert exc_info.value.status_code == 422
+
+# Prueba que una operación fallida no se guarda y puede reintentarse
+@pytest.mark.asyncio
+async def test_failed_operation_is_not_stored(service: IdempotencyService):
+    async def failing():
+        raise HTTPException(status_code=404, detail="Cuenta no encontrada o ID inválido")
+
+    async def operation():
+        return Result(value=2)
+
+    with pytest.raises(HTTPException):
+        await service.execute("k4", "fp", failing)
+    assert await service.execute("k4", "fp", operation) == Result(value=2)
+
+# Prueba que si la solicitud original se cancela los duplicados reciben 409 y no CancelledError
+@pytest.mark.asyncio
+async def test_cancelled_original_gives_duplicates_conflict(service: IdempotencyService):
+    started = asyncio.Event()
+
+    async def operation():
+        started.set()
+        await asyncio.Event().wait() # Nunca termina: el cliente se desconecta
+        return Result(value=1)
+
+    original = asyncio.create_task(service.execute("k5", "fp", operation))
+    await started.wait()
+    duplicate = asyncio.create_task(service.execute("k5", "fp", operation))
+    await asyncio.sleep(0)
+    original.cancel()
+    with pytest.raises(HTTPException) as exc_info:
+        await duplicate
+    assert exc_info.value.status_code == 409
+    assert original.cancelled()
+
+class StaleReservationCRUD:
+    """Colección simulada con una reserva pendiente de un proceso que terminó sin completarla."""
+
+    def __init__(self, locked_until: datetime):
+        self.document = {"_id": "k6", "fingerprint": "fp", "status": "pending", "locked_until": locked_until}
+        self.reserve_calls = 0
+        self.completed = None
+
+    async def reserve(self, key, fingerprint):
+        self.reserve_calls += 1
+        if IdempotencyCRUD.lease_expired(self.document):
+            self.document["locked_until"] = datetime.now(timezone.utc) + timedelta(seconds=30)
+            return None
+        return dict(self.document)
+
+    async def get(self, key):
+        return dict(self.document)
+
+    lease_expired = staticmethod(IdempotencyCRUD.lease_expired)
+
+    async def complete(self, key, status_code, body):
+        self.completed = (status_code, body)
+
+    async def release(self, key):
+        pass
+
+# Prueba que una reserva pendiente vencida la toma el reintento en lugar de esperar hasta el TTL
+@pytest.mark.asyncio
+async def test_expired_reservation_is_taken_over():
+    crud = StaleReservationCRUD(datetime.now(timezone.utc) + timedelta(seconds=0.1))
+    service = IdempotencyService(crud, IdempotencyCache(max_size=10, ttl_seconds=60))
+
+    async def operation():
+        return Result(value=3)
+
+    assert await service.execute("k6", "fp", operation) == Result(value=3)
+    assert crud.reserve_calls == 2 # Reserva vigente, espera, y la toma al vencer
+    assert crud.completed == (200, {"value": 3})
+
+# Prueba en MongoDB que una reserva vencida se toma y una vigente no
+@pytest.mark.asyncio
+async def test_reserve_takes_over_expired_lease(mongo_available):
+    if not mongo_available:
+        pytest.skip("MongoDB no está disponible")
+    await db.connect()
+    crud = IdempotencyCRUD(db.database)
+    try:
+        await crud.collection.delete_many({})
+        assert await crud.reserve("k7", "fp") is None
+        assert (await crud.reserve("k7", "fp"))["status"] == "pending" # Reserva vigente
+        await crud.collection.update_one({"_id": "k7"}, {"$set": {"locked_until": datetime.now(timezone.utc) - timedelta(seconds=1)}})
+        assert (await crud.reserve("k7", "otra")) is not None # Otra huella no puede tomarla
+        assert await crud.reserve("k7", "fp") is None
+        assert not crud.lease_expired(await crud.get("k7"))
+    finally:
+        await crud.collection.delete_many({})
+        await db.close()
+
+# Prueba que un duplicado del mismo proceso no espera indefinidamente a una original colgada
+@pytest.mark.asyncio
+async def test_duplicate_wait_is_bounded(service: IdempotencyService, monkeypatch):
+    monkeypatch.setattr(settings, "IDEMPOTENCY_WAIT_TIMEOUT", 0.05)
+    started = asyncio.Event()
+    release = asyncio.Event()
+
+    async def operation():
+        started.set()
+        await release.wait() # Simula una llamada a MongoDB bloqueada
+        return Result(value=8)
+
+    original = asyncio.create_task(service.execute("k8", "fp", operation))
+    await started.wait()
+    with pytest.raises(HTTPException) as exc_info:
+        await service.execute("k8", "fp", operation)
+    assert exc_info.value.status_code == 409
+    assert exc_info.value.headers["Retry-After"] == "1"
+    # La solicitud original no se ve afectada por el duplicado que dejó de esperar
+    release.set()
+    assert await original == Result(value=8)
+
+# Prueba en MongoDB que cambiar IDEMPOTENCY_TTL_SECONDS actualiza el índice existente
+@pytest.mark.asyncio
+async def test_ensure_indexes_updates_ttl(mongo_available, monkeypatch):
+    if not mongo_available:
+        pytest.skip("MongoDB no está disponible")
+    await db.connect()
+    crud = IdempotencyCRUD(db.database)
+    try:
+        await crud.collection.drop()
+        await crud.ensure_indexes()
+        monkeypatch.setattr(settings, "IDEMPOTENCY_TTL_SECONDS", 120)
+        await crud.ensure_indexes() # Sin IndexOptionsConflict
+        indexes = await crud.collection.index_information()
+        assert indexes["idempotency_ttl"]["expireAfterSeconds"] == 120
+    finally:
+        await crud.collection.drop()
+        await db.close()
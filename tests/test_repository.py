@@ -0,0 +1,146 @@
+import pytest
+from bson import ObjectId
+from bson.int64 import Int64
+from app.core.config import settings
+from app.core.money import from_minor, to_minor
+from app.crud.account import AccountCRUD
+from app.crud.repository import InMemoryAccountRepository
+from app.jobs.migrate_balances import migrate
+from app.jobs.reconcile_balances import reconcile
+from app.schemas.account import AccountCreate, DocumentType
+
+ACCOUNT_DATA = {
+    "account_number": "REPO-001",
+    "account_type": "savings",
+    "customer_name": "Laura Gómez",
+    "document_type": "CC",
+    "document_number": "99999999",
+    "phone": "555-9999",
+    "email": "laura@example.com",
+    "address": "999 Ninth Street",
+    "balance": 100.0
+}
+
+# Fixture de paridad: las mismas pruebas se ejecutan contra memoria y MongoDB
+@pytest.fixture
+def crud(repository):
+    return AccountCRUD(repository)
+
+# Prueba que los IDs generados tienen formato ObjectId
+@pytest.mark.asyncio
+async def test_create_assigns_object_id(crud: AccountCRUD):
+    account = await crud.create_account(AccountCreate(**ACCOUNT_DATA))
+    assert ObjectId.is_valid(account.id)
+    assert (await crud.get_account_by_id(account.id)).customer_name == "Laura Gómez"
+    assert [a.id for a in await crud.get_all_accounts()] == [account.id]
+
+# Prueba que el saldo se incrementa y decrementa como $inc
+@pytest.mark.asyncio
+async def test_balance_increment(crud: AccountCRUD):
+    account = await crud.create_account(AccountCreate(**ACCOUNT_DATA))
+    assert (await crud.update_account_balance(account.id, 50.0)).balance == 150.0
+    assert (await crud.update_account(account.id, {"amount": -25.0})).balance == 125.0
+
+# Prueba que $set solo modifica los campos enviados
+@pytest.mark.asyncio
+async def test_partial_set(crud: AccountCRUD):
+    account = await crud.create_account(AccountCreate(**ACCOUNT_DATA))
+    updated = await crud.update_account(account.id, {"phone": "555-0000", "amount": 1.0})
+    assert updated.phone == "555-0000"
+    assert updated.customer_name == "Laura Gómez"
+    assert updated.balance == 101.0
+    assert await crud.update_account(account.id, {}) is None
+
+# Prueba los IDs inválidos o inexistentes
+@pytest.mark.asyncio
+async def test_missing_and_invalid_ids(crud: AccountCRUD):
+    missing = str(ObjectId())
+    assert await crud.get_account_by_id(missing) is None
+    assert await crud.get_account_by_id("invalid_id_format") is None
+    assert await crud.update_account_balance(missing, 10.0) is None
+    assert await crud.update_account("invalid_id_format", {"amount": 10.0}) is None
+
+# Prueba que en modo minor_units el saldo se guarda como entero y no acumula deriva
+@pytest.mark.asyncio
+async def test_minor_units_storage(crud: AccountCRUD, monkeypatch):
+    monkeypatch.setattr(settings, "BALANCE_STORAGE", "minor_units")
+    account = await crud.create_account(AccountCreate(**{**ACCOUNT_DATA, "balance": 0.1}))
+    for _ in range(3):
+        updated = await crud.update_account(account.id, {"amount": 0.1})
+    assert updated.balance == 0.4
+    stored = await crud.repository.find_by_id(account.id)
+    assert stored["balance_minor"] == 40
+    assert "balance" not in stored
+    assert (await crud.update_account_balance(account.id, -0.15)).balance == 0.25
+
+# Documento tal como quedaría almacenado con el saldo en cada formato
+def stored_document(**balance_fields) -> dict:
+    document = AccountCreate(**ACCOUNT_DATA).model_dump()
+    document.pop("balance")
+    document.update(balance_fields)
+    return document
+
+# Prueba que con la API en modo float un documento ya migrado sigue sumando en unidades menores
+@pytest.mark.asyncio
+async def test_float_mode_updates_migrated_document(crud: AccountCRUD):
+    created = await crud.repository.insert(stored_document(balance_minor=Int64(10000)))
+    assert (await crud.update_account(created["_id"], {"amount": 50.0})).balance == 150.0
+    stored = await crud.repository.find_by_id(created["_id"])
+    assert stored["balance_minor"] == 15000
+    assert "balance" not in stored
+
+# Prueba que en modo minor_units un documento sin migrar se migra en su primera escritura
+@pytest.mark.asyncio
+async def test_minor_units_mode_migrates_on_first_write(crud: AccountCRUD, monkeypatch):
+    monkeypatch.setattr(settings, "BALANCE_STORAGE", "minor_units")
+    created = await crud.repository.insert(stored_document(balance=100.0))
+    assert (await crud.update_account_balance(created["_id"], 5.0)).balance == 105.0
+    stored = await crud.repository.find_by_id(created["_id"])
+    assert stored["balance_minor"] == 10500
+    assert "balance" not in stored
+
+# Prueba que un documento con ambos campos expone la suma y se repara en la siguiente escritura
+@pytest.mark.asyncio
+async def test_mixed_document_is_folded(crud: AccountCRUD):
+    created = await crud.repository.insert(stored_document(balance_minor=Int64(10000), balance=50.0))
+    assert (await crud.get_account_by_id(created["_id"])).balance == 150.0
+    assert (await crud.update_account(created["_id"], {"amount": 1.0})).balance == 151.0
+    stored = await crud.repository.find_by_id(created["_id"])
+    assert stored["balance_minor"] == 15100
+    assert "balance" not in stored
+
+# Prueba que la migración y la conciliación incluyen el 'balance' residual (solo MongoDB)
+@pytest.mark.asyncio
+async def test_migration_folds_residual_balance(crud: AccountCRUD):
+    if isinstance(crud.repository, InMemoryAccountRepository):
+        pytest.skip("Los jobs usan pipelines de MongoDB")
+    collection = crud.repository.collection
+    await crud.repository.insert(stored_document(balance=100.0))
+    await crud.repository.insert(stored_document(balance_minor=Int64(10000), balance=50.0))
+    report = await reconcile(collection, 2)
+    assert report["total_minor"] == 25000
+    assert report["groups"][0]["mixed"] == 1
+    summary = await migrate(collection, batch_size=1, scale=2)
+    assert summary["migrated"] == 2
+    assert sorted([document["balance_minor"] for document in await crud.repository.find_all()]) == [10000, 15000]
+    assert (await reconcile(collection, 2))["total_minor"] == 25000
+
+# Prueba la conversión entre montos decimales y unidades menores
+def test_minor_units_conversion():
+    assert to_minor(0.1) == 10
+    assert to_minor(1000.5) == 100050
+    assert to_minor(0.125) == 12 # Redondeo al par más cercano
+    assert to_minor(-2.675) == -268
+    assert from_minor(12345) == 123.45
+    assert from_minor(to_minor(19.99)) == 19.99
+
+# Prueba que ambos backends guardan los Enum como texto plano (igual que BSON)
+@pytest.mark.asyncio
+async def test_enum_values_stored_as_plain_strings(crud: AccountCRUD):
+    account = await crud.create_account(AccountCreate(**ACCOUNT_DATA))
+    stored = await crud.repository.find_by_id(account.id)
+    assert type(stored["document_type"]) is str
+    await crud.update_account(account.id, {"document_type": DocumentType.PP})
+    stored = await crud.repository.find_by_id(account.id)
+    assert type(stored["document_type"]) is str
+    assert stored["document_type"] == "PP"
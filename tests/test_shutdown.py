@@ -0,0 +1,29 @@
+import asyncio
+import signal
+import pytest
+from app.core.shutdown import on_shutdown_signal
+
+# Prueba que la señal ejecuta el callback, llama al manejador anterior y que restore lo reinstala
+@pytest.mark.asyncio
+async def test_shutdown_signal_chains_and_restores():
+    received = []
+    closed = asyncio.Event()
+
+    def server_handler(signum, frame):
+        received.append(signum)
+
+    original = signal.signal(signal.SIGTERM, server_handler)
+    try:
+        restore = on_shutdown_signal(closed.set)
+        assert signal.getsignal(signal.SIGTERM) is not server_handler
+        signal.raise_signal(signal.SIGTERM)
+        await asyncio.wait_for(closed.wait(), timeout=1.0)
+        assert received == [signal.SIGTERM]
+
+        restore()
+        assert signal.getsignal(signal.SIGTERM) is server_handler
+        # Varias ejecuciones del lifespan no apilan manejadores
+        on_shutdown_signal(closed.set)()
+        assert signal.getsignal(signal.SIGTERM) is server_handler
+    finally:
+        signal.signal(signal.SIGTERM, original)